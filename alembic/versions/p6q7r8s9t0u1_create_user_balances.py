@@ -0,0 +1,95 @@
+"""create user_balances table maintained by user_credits trigger
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-03-02 12:00:00.000000
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision: str = "p6q7r8s9t0u1"
+down_revision: Union[str, None] = "o5p6q7r8s9t0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_balances",
+        sa.Column("user_id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("balance", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), nullable=False,
+            server_default=sa.text("now()"),
+        ),
+    )
+
+    op.execute("ALTER TABLE user_balances ENABLE ROW LEVEL SECURITY;")
+    op.execute("""
+        CREATE POLICY user_balances_select_own ON user_balances
+        FOR SELECT
+        USING (auth.uid() = user_id);
+    """)
+
+    # Apply the change in spendable credits (remaining_amount of non-refunded
+    # batches) to the owner's balance row, creating it from the delta when
+    # missing. Seeding from SUM() here would double-count: in an AFTER row
+    # trigger the SUM already sees every row the statement changed. Ledgers
+    # that predate this table are brought in by
+    # scripts/backfill_user_balances.py, not by this migration.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_user_balance()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            target_user uuid;
+            delta numeric := 0;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND NOT OLD.is_refunded THEN
+                delta := delta - OLD.remaining_amount;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NOT NEW.is_refunded THEN
+                delta := delta + NEW.remaining_amount;
+            END IF;
+
+            IF TG_OP = 'DELETE' THEN
+                target_user := OLD.user_id;
+            ELSE
+                target_user := NEW.user_id;
+            END IF;
+
+            IF delta = 0 THEN
+                RETURN NULL;
+            END IF;
+
+            UPDATE user_balances
+            SET balance = balance + delta, updated_at = now()
+            WHERE user_id = target_user;
+
+            IF NOT FOUND THEN
+                INSERT INTO user_balances (user_id, balance)
+                VALUES (target_user, delta)
+                ON CONFLICT (user_id) DO UPDATE
+                SET balance = user_balances.balance + delta, updated_at = now();
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql SECURITY DEFINER SET search_path TO 'public';
+    """)
+
+    op.execute("""
+        CREATE TRIGGER trg_user_credits_sync_balance
+            AFTER INSERT OR UPDATE OF remaining_amount, is_refunded OR DELETE ON user_credits
+            FOR EACH ROW
+            EXECUTE FUNCTION sync_user_balance();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_user_credits_sync_balance ON user_credits;")
+    op.execute("DROP FUNCTION IF EXISTS sync_user_balance();")
+    op.execute("DROP POLICY IF EXISTS user_balances_select_own ON user_balances;")
+    op.drop_table("user_balances")
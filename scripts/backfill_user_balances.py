@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Backfill user_balances from existing user_credits ledgers.
+
+The user_balances trigger only applies deltas, so users whose batches
+predate the table need their row computed once. Run this right after
+deploying the p6q7r8s9t0u1 migration; until then get_balance() sums the
+batches for users without a row. Safe to re-run: every row is recomputed
+from the batches, one user per transaction.
+
+Usage:
+    python -m scripts.backfill_user_balances
+"""
+
+import asyncio
+import logging
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from src.db.engine import close_db, get_session_factory, init_db
+from src.db.models import UserCredits
+from src.services.credit_service import CreditService
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill() -> int:
+    """Rebuild the balance row of every user with credit batches."""
+    await init_db()
+    session_factory = get_session_factory()
+    if session_factory is None:
+        raise RuntimeError("Database not initialized. Is DATABASE_URL set?")
+
+    try:
+        async with session_factory() as session:
+            user_ids = (await session.execute(select(UserCredits.user_id).distinct())).scalars().all()
+
+        for user_id in user_ids:
+            async with session_factory() as session:
+                balance = await CreditService(session).rebuild_balance(user_id)
+            logger.info(f"Rebuilt balance for user {user_id}: {balance}")
+        return len(user_ids)
+    finally:
+        await close_db()
+
+
+def main():
+    """Backfill user_balances for every existing ledger."""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(backfill())
+    print(f"Rebuilt {count} user balances")
+
+
+if __name__ == "__main__":
+    main()
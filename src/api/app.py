@@ -23,6 +23,7 @@ from src.api.routes import health, books, stories, credits, config
 from src.services.credit_service import CreditService, InsufficientCreditsError
 from src.core.cloudwatch_logging import setup_cloudwatch_logging, flush_cloudwatch_logging
 from src.db.engine import init_db, close_db, get_session_factory
+from src.tasks.book_tasks import shutdown_pdf_executor
 
 
 # Configure logging
@@ -91,6 +92,7 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
     await close_db()
+    shutdown_pdf_executor()
     logger.info("Application shutting down...")
     flush_cloudwatch_logging()
 
@@ -27,7 +27,7 @@ from src.api.deps import get_db, get_current_user_id
 from src.core.config import LLMConfig
 from src.core.story_generator import StoryGenerator
 from src.db import repository as repo
-from src.tasks.story_tasks import create_story_task
+from src.tasks.story_tasks import admit_story, create_story_task
 from src.services.credit_service import CreditService
 from src.api.rate_limit import limiter
 
@@ -41,7 +41,7 @@ router = APIRouter(prefix="/stories", tags=["Story Creation"])
 @router.post(
     "/create",
     response_model=StoryCreateResponse,
-    responses={400: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 503: {"model": ErrorResponse}},
 )
 @limiter.limit("5/minute")
 async def create_story(
@@ -76,37 +76,47 @@ async def create_story(
     if not body.prompt.strip():
         raise HTTPException(status_code=400, detail="Story prompt cannot be empty")
 
-    job_id = uuid.uuid4()
-
-    # Reserve credits (InsufficientCreditsError handled by app-level exception handler)
-    credit_service = CreditService(db)
-    story_cost = await credit_service.calculate_story_cost()
-    pricing_snapshot = await credit_service.get_pricing()
-    usage_log_id = await credit_service.reserve(
-        user_id=user_id,
-        amount=story_cost,
-        job_id=job_id,
-        job_type="story",
-        description="Story generation",
-        metadata={
-            "prompt": body.prompt[:100],
-            "total_cost": float(story_cost),
-            "pricing_snapshot": {k: float(v) for k, v in pricing_snapshot.items()},
-        },
-    )
+    # Admit before reserving credits so a full backlog is refused up front;
+    # the background task gives the admission back when it finishes.
+    admission = admit_story()
+    if admission is None:
+        raise HTTPException(status_code=503, detail="Too many stories in progress. Please try again shortly.")
 
-    # Create job in database — release reserved credits if this fails
     try:
-        await repo.create_story_job(
-            db, job_id=job_id, user_id=user_id,
-            request_params=body.model_dump(),
+        job_id = uuid.uuid4()
+
+        # Reserve credits (InsufficientCreditsError handled by app-level exception handler)
+        credit_service = CreditService(db)
+        story_cost = await credit_service.calculate_story_cost()
+        pricing_snapshot = await credit_service.get_pricing()
+        usage_log_id = await credit_service.reserve(
+            user_id=user_id,
+            amount=story_cost,
+            job_id=job_id,
+            job_type="story",
+            description="Story generation",
+            metadata={
+                "prompt": body.prompt[:100],
+                "total_cost": float(story_cost),
+                "pricing_snapshot": {k: float(v) for k, v in pricing_snapshot.items()},
+            },
         )
-    except Exception:
-        await credit_service.release(usage_log_id, user_id)
+
+        # Create job in database — release reserved credits if this fails
+        try:
+            await repo.create_story_job(
+                db, job_id=job_id, user_id=user_id,
+                request_params=body.model_dump(),
+            )
+        except Exception:
+            await credit_service.release(usage_log_id, user_id)
+            raise
+    except BaseException:
+        admission.release()
         raise
 
     # Start background task
-    background_tasks.add_task(create_story_task, str(job_id), body, user_id, usage_log_id)
+    background_tasks.add_task(create_story_task, str(job_id), body, user_id, usage_log_id, admission)
 
     return StoryCreateResponse(
         job_id=str(job_id),
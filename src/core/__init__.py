@@ -5,7 +5,12 @@ Core business logic modules.
 from src.core.config import LLMConfig
 from src.core.llm_connector import OpenRouterClient
 from src.core.text_processor import TextProcessor, BookContent, BookPage, PageType, validate_book_content
-from src.core.pdf_generator import generate_both_pdfs, get_print_instructions
+from src.core.pdf_generator import (
+    generate_both_pdfs,
+    render_booklet_pdf,
+    render_review_pdf,
+    get_print_instructions,
+)
 from src.core.image_generator import ImageConfig, BookImageGenerator
 
 __all__ = [
@@ -17,6 +22,8 @@ __all__ = [
     "PageType",
     "validate_book_content",
     "generate_both_pdfs",
+    "render_booklet_pdf",
+    "render_review_pdf",
     "get_print_instructions",
     "ImageConfig",
     "BookImageGenerator",
@@ -73,6 +73,7 @@ class GeneratedImage:
     image_data: Optional[bytes] = None
     error: Optional[str] = None
     prompt_used: Optional[str] = None
+    prompt_hash: Optional[str] = None
     cached: bool = False
 
 
@@ -303,7 +304,7 @@ class BookImageGenerator:
         visual_context: Optional[StoryVisualContext] = None,
         storage: Optional[Any] = None,
         book_job_id: Optional[str] = None,
-        cache_check_fn: Optional[Callable[[str], Awaitable[Any]]] = None,
+        cache_check_fn: Optional[Callable[..., Awaitable[Any]]] = None,
     ):
         self.config = config
         if book_config is None:
@@ -328,10 +329,20 @@ class BookImageGenerator:
 
     @staticmethod
     def compute_prompt_hash(prompt: str) -> str:
-        """Compute MD5 hash of a prompt for cache lookup."""
+        """Compute a 128-bit BLAKE2b hash of a prompt for cache lookup.
+
+        32 hex chars, same width as the MD5 hashes stored by older rows.
+        """
+        return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def compute_legacy_prompt_hash(prompt: str) -> str:
+        """MD5 prompt hash stored by images generated before BLAKE2b."""
         return hashlib.md5(prompt.encode()).hexdigest()
 
-    async def _check_cache(self, prompt: str, page_number: int) -> Optional[GeneratedImage]:
+    async def _check_cache(
+        self, prompt: str, page_number: int, prompt_hash: Optional[str] = None,
+    ) -> Optional[GeneratedImage]:
         """Check DB + R2 for a cached image with the same prompt hash.
 
         Returns the cached image data (needed for PDF generation) and
@@ -342,8 +353,12 @@ class BookImageGenerator:
             return None
 
         try:
-            prompt_hash = self.compute_prompt_hash(prompt)
-            cached_row = await self.cache_check_fn(prompt_hash)
+            prompt_hash = prompt_hash or self.compute_prompt_hash(prompt)
+            # Rows cached before the BLAKE2b switch are keyed by MD5: look up
+            # both in one query, preferring the current hash
+            cached_row = await self.cache_check_fn(
+                prompt_hash, self.compute_legacy_prompt_hash(prompt)
+            )
             if cached_row is None or not cached_row.r2_key:
                 return None
 
@@ -358,6 +373,7 @@ class BookImageGenerator:
                 image_path=cached_row.r2_key,
                 image_data=image_data,
                 prompt_used=prompt,
+                prompt_hash=prompt_hash,
                 cached=True,
             )
         except Exception as e:
@@ -503,7 +519,9 @@ class BookImageGenerator:
                     is_end=(page_type == 'end'),
                 )
 
-                cached = await self._check_cache(prompt, page_num)
+                # Hashed once here; the result carries it to the DB row
+                prompt_hash = self.compute_prompt_hash(prompt)
+                cached = await self._check_cache(prompt, page_num, prompt_hash)
                 if cached:
                     logger.info(f"Page {page_num}: Cache hit")
                     return page_num, cached
@@ -518,6 +536,8 @@ class BookImageGenerator:
                     except ImageGenerationError as e:
                         result = GeneratedImage(success=False, error=str(e), prompt_used=prompt)
 
+                result.prompt_hash = prompt_hash
+
                 # Upload to R2 outside semaphore (network I/O, not rate-limited)
                 if result.success and result.image_data and self.storage and self.book_job_id:
                     r2_key = await self._upload_image(result.image_data, page_num)
@@ -14,7 +14,7 @@ import os
 import io
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, TYPE_CHECKING
+from typing import List, Tuple, Optional, Dict, TYPE_CHECKING, Union
 from dataclasses import dataclass
 
 import logging
@@ -192,10 +192,14 @@ class FontManager:
         return "Helvetica"
 
 
+# A page image as encoded bytes, or the path of a file holding them
+PageImage = Union[bytes, str]
+
+
 class ImageCache:
     """Cache for ImageReader objects to avoid redundant processing."""
 
-    def __init__(self, images: Optional[Dict[int, bytes]] = None):
+    def __init__(self, images: Optional[Dict[int, PageImage]] = None):
         self._images = images or {}
         self._readers: Dict[int, Optional[ImageReader]] = {}
 
@@ -203,9 +207,11 @@ class ImageCache:
         """Get cached ImageReader for a page, creating it if needed."""
         if page_num not in self._readers:
             if page_num in self._images and self._images[page_num]:
+                image = self._images[page_num]
                 try:
+                    # ImageReader reads a path itself; bytes need a stream
                     self._readers[page_num] = ImageReader(
-                        io.BytesIO(self._images[page_num])
+                        image if isinstance(image, str) else io.BytesIO(image)
                     )
                 except Exception:
                     self._readers[page_num] = None
@@ -695,7 +701,7 @@ class PDFBookletGenerator(BasePDFGenerator):
     def __init__(
         self,
         config: BookGenerateRequest,
-        images: Optional[Dict[int, bytes]] = None,
+        images: Optional[Dict[int, PageImage]] = None,
         image_cache: Optional[ImageCache] = None,
         text_cache: Optional[TextWrapCache] = None,
         font_manager: Optional[FontManager] = None,
@@ -773,7 +779,7 @@ def generate_booklet_pdf(
     content: BookContent,
     output_path: str,
     config: Optional[BookGenerateRequest] = None,
-    images: Optional[Dict[int, bytes]] = None,
+    images: Optional[Dict[int, PageImage]] = None,
     image_cache: Optional[ImageCache] = None,
     text_cache: Optional[TextWrapCache] = None,
     font_manager: Optional[FontManager] = None,
@@ -785,7 +791,7 @@ def generate_booklet_pdf(
         content: BookContent with pages
         output_path: Output file path
         config: Book configuration (uses defaults if not provided)
-        images: Optional dict mapping page_number to image bytes
+        images: Optional dict mapping page_number to image bytes or file path
         image_cache: Optional shared ImageCache (created from images if not provided)
         text_cache: Optional shared TextWrapCache
         font_manager: Optional shared FontManager
@@ -813,7 +819,7 @@ class PDFSequentialGenerator(BasePDFGenerator):
     def __init__(
         self,
         config: BookGenerateRequest,
-        images: Optional[Dict[int, bytes]] = None,
+        images: Optional[Dict[int, PageImage]] = None,
         image_cache: Optional[ImageCache] = None,
         text_cache: Optional[TextWrapCache] = None,
         font_manager: Optional[FontManager] = None,
@@ -838,6 +844,7 @@ class PDFSequentialGenerator(BasePDFGenerator):
         Returns:
             Path to generated PDF
         """
+        # Ensure output directory exists
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
         # Create PDF with A5 portrait size
@@ -869,7 +876,7 @@ def generate_sequential_pdf(
     content: BookContent,
     output_path: str,
     config: Optional[BookGenerateRequest] = None,
-    images: Optional[Dict[int, bytes]] = None,
+    images: Optional[Dict[int, PageImage]] = None,
     image_cache: Optional[ImageCache] = None,
     text_cache: Optional[TextWrapCache] = None,
     font_manager: Optional[FontManager] = None,
@@ -881,7 +888,7 @@ def generate_sequential_pdf(
         content: BookContent with pages
         output_path: Output file path
         config: Book configuration (uses defaults if not provided)
-        images: Optional dict mapping page_number to image bytes
+        images: Optional dict mapping page_number to image bytes or file path
         image_cache: Optional shared ImageCache (created from images if not provided)
         text_cache: Optional shared TextWrapCache
         font_manager: Optional shared FontManager
@@ -908,7 +915,7 @@ def generate_both_pdfs(
     booklet_path: str,
     review_path: str,
     config: Optional[BookGenerateRequest] = None,
-    images: Optional[Dict[int, bytes]] = None
+    images: Optional[Dict[int, PageImage]] = None
 ) -> Tuple[str, str]:
     """
     Generate both booklet and sequential PDFs.
@@ -921,7 +928,7 @@ def generate_both_pdfs(
         booklet_path: Output path for booklet PDF
         review_path: Output path for review PDF
         config: Book configuration
-        images: Optional dict mapping page_number to image bytes
+        images: Optional dict mapping page_number to image bytes or file path
 
     Returns:
         Tuple of (booklet_path, review_path)
@@ -957,6 +964,32 @@ def generate_both_pdfs(
     return booklet, review
 
 
+def render_booklet_pdf(
+    content: BookContent,
+    output_path: str,
+    config: Optional[BookGenerateRequest] = None,
+    images: Optional[Dict[int, PageImage]] = None,
+) -> None:
+    """
+    Generate the booklet PDF into output_path with this process's shared fonts.
+
+    Takes only picklable arguments, so the booklet and review can render in
+    separate worker processes. The PDF stays on disk for the caller to
+    stream instead of being pickled back through the pool.
+    """
+    generate_booklet_pdf(content, output_path, config, images=images, font_manager=get_font_manager())
+
+
+def render_review_pdf(
+    content: BookContent,
+    output_path: str,
+    config: Optional[BookGenerateRequest] = None,
+    images: Optional[Dict[int, PageImage]] = None,
+) -> None:
+    """Generate the sequential review PDF into output_path; see render_booklet_pdf."""
+    generate_sequential_pdf(content, output_path, config, images=images, font_manager=get_font_manager())
+
+
 def get_print_instructions(language: str = "English") -> str:
     """Get printing instructions for the booklet."""
     instructions = {
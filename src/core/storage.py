@@ -5,12 +5,14 @@ Uses aioboto3 for non-blocking uploads/downloads inside asyncio.gather().
 """
 
 import asyncio
+import io
 import os
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 
 import aioboto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
@@ -18,6 +20,32 @@ logger = logging.getLogger(__name__)
 
 _storage: Optional["R2Storage"] = None
 
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # bytes per read when streaming to a file
+_DELETE_BATCH_SIZE = 1000  # S3 DeleteObjects limit per request
+
+# Uploads at or above the threshold go up as a multipart upload with parts
+# sent in parallel; a single PUT stream is bandwidth-bound for large PDFs.
+_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+_MULTIPART_CONFIG = TransferConfig(
+    multipart_threshold=_MULTIPART_THRESHOLD,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+)
+
+
+class _ThreadedFileReader:
+    """Binary file wrapper whose read() runs in a worker thread.
+
+    upload_fileobj awaits read() when it returns an awaitable, so multipart
+    uploads read each part from disk off the event loop.
+    """
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+
+    async def read(self, size: int = -1) -> bytes:
+        return await asyncio.to_thread(self._f.read, size)
+
 
 def build_image_r2_key(job_id: str, page_number: int) -> str:
     """Build the R2 key for a generated image."""
@@ -58,23 +86,51 @@ class R2Storage:
     async def upload_bytes(
         self, data: bytes, key: str, content_type: str = "application/octet-stream"
     ) -> None:
-        """Upload raw bytes to R2."""
+        """Upload raw bytes to R2, in parallel parts when large."""
         async with self._client() as client:
-            await client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=data,
-                ContentType=content_type,
-            )
+            if len(data) >= _MULTIPART_THRESHOLD:
+                await client.upload_fileobj(
+                    io.BytesIO(data),
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={"ContentType": content_type},
+                    Config=_MULTIPART_CONFIG,
+                )
+            else:
+                await client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=data,
+                    ContentType=content_type,
+                )
         logger.debug(f"Uploaded {len(data)} bytes to {key}")
 
     async def upload_file(
         self, file_path: str, key: str, content_type: str = "application/octet-stream"
     ) -> int:
-        """Read a local file and upload to R2. Returns file size in bytes."""
-        data = await asyncio.to_thread(Path(file_path).read_bytes)
-        await self.upload_bytes(data, key, content_type)
-        return len(data)
+        """Upload a local file to R2. Returns file size in bytes.
+
+        Large files are streamed from disk as a multipart upload, so only
+        the parts in flight are held in memory. File reads run in a worker
+        thread, never on the event loop.
+        """
+        size = (await asyncio.to_thread(os.stat, file_path)).st_size
+        if size < _MULTIPART_THRESHOLD:
+            data = await asyncio.to_thread(Path(file_path).read_bytes)
+            await self.upload_bytes(data, key, content_type)
+            return len(data)
+
+        async with self._client() as client:
+            with await asyncio.to_thread(open, file_path, "rb") as f:
+                await client.upload_fileobj(
+                    _ThreadedFileReader(f),
+                    self.bucket_name,
+                    key,
+                    ExtraArgs={"ContentType": content_type},
+                    Config=_MULTIPART_CONFIG,
+                )
+        logger.debug(f"Uploaded {size} bytes from {file_path} to {key}")
+        return size
 
     async def download_bytes(self, key: str) -> Optional[bytes]:
         """Download object as bytes. Returns None if the key does not exist."""
@@ -88,11 +144,62 @@ class R2Storage:
                 return None
             raise
 
+    async def download_to_file(self, key: str, file_path: str) -> Optional[int]:
+        """Stream an object into a local file without holding it in memory.
+
+        Returns the number of bytes written, or None if the key does not exist.
+        """
+        try:
+            async with self._client() as client:
+                resp = await client.get_object(Bucket=self.bucket_name, Key=key)
+                size = 0
+                with open(file_path, "wb") as f:
+                    async for chunk in resp["Body"].iter_chunks(_DOWNLOAD_CHUNK_SIZE):
+                        await asyncio.to_thread(f.write, chunk)
+                        size += len(chunk)
+                return size
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+
     async def delete(self, key: str) -> None:
         """Delete a single object. No error if missing."""
         async with self._client() as client:
             await client.delete_object(Bucket=self.bucket_name, Key=key)
 
+    async def delete_many(self, keys: list[str]) -> int:
+        """Delete objects by key, in batches of up to 1000 per request. No error if missing.
+
+        Every batch is attempted; keys the service reports as not deleted are
+        logged and then raised as a ClientError, as delete() would for one key.
+        Returns the number of keys deleted.
+        """
+        if not keys:
+            return 0
+        errors = []
+        async with self._client() as client:
+            for start in range(0, len(keys), _DELETE_BATCH_SIZE):
+                batch = keys[start:start + _DELETE_BATCH_SIZE]
+                # Quiet mode: the response lists only the keys that failed
+                response = await client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+                errors.extend(response.get("Errors", []))
+        for error in errors:
+            logger.error(f"Failed to delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+        if errors:
+            raise ClientError(
+                {"Error": {
+                    "Code": errors[0].get("Code", "DeleteObjectsFailed"),
+                    "Message": f"{len(errors)} of {len(keys)} objects were not deleted",
+                }},
+                "DeleteObjects",
+            )
+        logger.debug(f"Deleted {len(keys)} objects")
+        return len(keys)
+
     async def delete_prefix(self, prefix: str) -> int:
         """Delete all objects under a prefix. Returns count of deleted objects."""
         deleted = 0
@@ -48,6 +48,35 @@ class BookContent:
         """Check if page count is even (required for booklet printing)."""
         return self.total_pages % 2 == 0
 
+    def to_dict(self) -> dict:
+        """Serialize to a JSON-compatible dict (see from_dict)."""
+        return {
+            "title": self.title,
+            "author": self.author,
+            "language": self.language,
+            "pages": [
+                {"page_type": p.page_type.value, "content": p.content, "page_number": p.page_number}
+                for p in self.pages
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BookContent":
+        """Rebuild BookContent serialized by to_dict without re-processing the story."""
+        return cls(
+            title=data["title"],
+            author=data["author"],
+            language=data["language"],
+            pages=[
+                BookPage(
+                    page_type=PageType(p["page_type"]),
+                    content=p["content"],
+                    page_number=p["page_number"],
+                )
+                for p in data["pages"]
+            ],
+        )
+
 
 class TextProcessor:
     """Process and prepare text for children's book pages."""
@@ -391,11 +420,11 @@ def validate_book_content(content: BookContent) -> List[str]:
         warnings.append("Page count is not even (required for booklet printing)")
     
     # Check for empty content pages
-    empty_content_pages = [
-        p for p in content.pages 
+    empty_content_pages = sum(
+        1 for p in content.pages
         if p.page_type == PageType.CONTENT and p.is_empty()
-    ]
+    )
     if empty_content_pages:
-        warnings.append(f"Found {len(empty_content_pages)} empty content pages")
+        warnings.append(f"Found {empty_content_pages} empty content pages")
     
     return warnings
@@ -34,21 +34,44 @@ async def init_db() -> None:
     elif database_url.startswith("postgresql://"):
         database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
+    # pgbouncer (Supabase pooler) cannot keep prepared statements across
+    # transactions, so asyncpg's statement cache defaults to off. Direct
+    # connections can opt in via DB_STATEMENT_CACHE_SIZE to reuse parsed
+    # plans for the hot credit queries.
+    statement_cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "0"))
+    connect_args = {"statement_cache_size": statement_cache_size}
+    if statement_cache_size > 0:
+        connect_args["prepared_statement_cache_size"] = statement_cache_size
+
+    # Request handlers and background tasks (credit confirm/release) share
+    # this pool; size it so reserve() doesn't queue behind long-running jobs.
+    pool_size = int(os.getenv("DB_POOL_SIZE", "15"))
+    max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "15"))
+    pool_timeout = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "300"))
+
+    # LIFO checkout keeps reusing the most recently returned connections,
+    # so at low load a small hot set serves requests and the rest stay idle
+    # instead of all being cycled through. Nothing here closes those idle
+    # connections: pool_recycle is only checked at checkout, so it just
+    # replaces a connection that is about to be reused. Idle backends are
+    # freed only by a server-side idle timeout, and pool_pre_ping then
+    # discards the dead connection on its next checkout.
     _engine = create_async_engine(
         database_url,
         echo=False,
-        pool_size=5,
-        max_overflow=10,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_use_lifo=True,
         pool_pre_ping=True,
-        pool_recycle=300,
-        connect_args={
-            "statement_cache_size": 0,
-        },
+        pool_recycle=pool_recycle,
+        connect_args=connect_args,
     )
     _async_session_factory = async_sessionmaker(
         _engine, class_=AsyncSession, expire_on_commit=False
     )
-    logger.info("Database engine initialized")
+    logger.info(f"Database engine initialized (pool_size={pool_size}, max_overflow={max_overflow})")
 
 
 async def close_db() -> None:
@@ -46,6 +46,9 @@ class BookJob(Base):
     review_filename: Mapped[str | None] = mapped_column(Text, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     request_params: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Processed pages from the original generation, reused by regeneration.
+    # Deferred so job listings don't load it; see get_book_job(with_content=True).
+    book_content_json: Mapped[dict | None] = mapped_column(JSONB, nullable=True, deferred=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -277,6 +280,25 @@ class UserCredits(Base):
     )
 
 
+class UserBalance(Base):
+    """Denormalized per-user credit balance, maintained by a trigger on user_credits."""
+    __tablename__ = "user_balances"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    balance: Mapped[Decimal] = mapped_column(
+        Numeric(12, 2), nullable=False, default=Decimal("0")
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
 class CreditPricing(Base):
     __tablename__ = "credit_pricing"
 
@@ -5,8 +5,9 @@ Repository layer: async CRUD operations for job persistence.
 import uuid
 from typing import Optional
 
-from sqlalchemy import select, update, delete, func, case
+from sqlalchemy import select, insert, update, delete, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from src.db.models import BookJob, StoryJob, GeneratedPdf, GeneratedImage, IllustrationStyle
 
@@ -37,9 +38,13 @@ async def create_book_job(
 
 
 async def get_book_job(
-    session: AsyncSession, job_id: uuid.UUID
+    session: AsyncSession, job_id: uuid.UUID, *, with_content: bool = False
 ) -> Optional[BookJob]:
-    result = await session.execute(select(BookJob).where(BookJob.id == job_id))
+    """Get a book job; with_content also loads the deferred book_content_json."""
+    query = select(BookJob).where(BookJob.id == job_id)
+    if with_content:
+        query = query.options(undefer(BookJob.book_content_json))
+    result = await session.execute(query)
     return result.scalar_one_or_none()
 
 
@@ -194,6 +199,17 @@ async def create_generated_pdf(
     return pdf
 
 
+async def bulk_create_generated_pdfs(
+    session: AsyncSession,
+    rows: list[dict],
+) -> None:
+    """Insert several generated PDF rows in one round trip."""
+    if not rows:
+        return
+    await session.execute(insert(GeneratedPdf), rows)
+    await session.commit()
+
+
 # ========================
 # GENERATED IMAGES
 # ========================
@@ -233,6 +249,20 @@ async def create_generated_image(
     return image
 
 
+async def bulk_create_generated_images(
+    session: AsyncSession,
+    rows: list[dict],
+) -> None:
+    """Insert generated image rows for a book in one round trip.
+
+    Each row carries the same keys as create_generated_image's arguments.
+    """
+    if not rows:
+        return
+    await session.execute(insert(GeneratedImage), rows)
+    await session.commit()
+
+
 async def update_generated_image(
     session: AsyncSession,
     image_id: uuid.UUID,
@@ -248,16 +278,20 @@ async def update_generated_image(
 
 async def find_cached_image_by_hash(
     session: AsyncSession,
-    prompt_hash: str,
+    *prompt_hashes: str,
 ) -> Optional[GeneratedImage]:
-    """Find any completed image with a matching prompt hash (for cross-book cache)."""
+    """Find any completed image matching one of the prompt hashes (for cross-book cache).
+
+    All hashes are looked up in one query; a match on an earlier hash wins.
+    """
     result = await session.execute(
         select(GeneratedImage)
         .where(
-            GeneratedImage.prompt_hash == prompt_hash,
+            GeneratedImage.prompt_hash.in_(prompt_hashes),
             GeneratedImage.status == "completed",
             GeneratedImage.r2_key.isnot(None),
         )
+        .order_by(GeneratedImage.prompt_hash != prompt_hashes[0])
         .limit(1)
     )
     return result.scalar_one_or_none()
@@ -275,6 +309,23 @@ async def get_images_for_book(
     return list(result.scalars().all())
 
 
+async def get_completed_image_keys(
+    session: AsyncSession,
+    book_job_id: uuid.UUID,
+) -> list[tuple[int, str]]:
+    """Get (page_number, r2_key) for every completed image of a book that has an R2 key."""
+    result = await session.execute(
+        select(GeneratedImage.page_number, GeneratedImage.r2_key)
+        .where(
+            GeneratedImage.book_job_id == book_job_id,
+            GeneratedImage.status == "completed",
+            GeneratedImage.r2_key.isnot(None),
+        )
+        .order_by(GeneratedImage.page_number)
+    )
+    return [(row.page_number, row.r2_key) for row in result.all()]
+
+
 async def get_failed_images_for_book(
     session: AsyncSession,
     book_job_id: uuid.UUID,
@@ -3,22 +3,84 @@ Credit management service.
 
 Handles credit balance checks, FIFO batch consumption, reservations,
 confirmations, and releases using SELECT ... FOR UPDATE for atomicity.
+Reservations consume batches and write their usage log in a single
+CTE-driven statement so row locks are held for one round trip.
 """
 
 import logging
+import os
+import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import select, func
+from sqlalchemy import (
+    BigInteger, Numeric, Text, case, cast, column, func, insert, lambda_stmt, literal, select, true, update,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models import CreditPricing, CreditUsageLog, UserCredits
+from src.db.models import CreditPricing, CreditUsageLog, UserBalance, UserCredits
 
 logger = logging.getLogger(__name__)
 
 
+# Credit columns are Numeric(10, 2); batches_consumed stores amounts in
+# these minor units (hundredths of a credit).
+_CREDIT_SCALE = 2
+_CREDIT_MINOR_UNITS = 10 ** _CREDIT_SCALE
+
+
+def _batches_consumed_entries(usage_log_id: uuid.UUID):
+    """Subquery of (batch_id, amount) rows decoded from a log's batches_consumed.
+
+    Current entries are ``[uuid_hex, minor_units]``; logs reserved before
+    that format carry ``{"batch_id": str, "amount": str}``.
+    """
+    entry = (
+        func.jsonb_array_elements(CreditUsageLog.extra_metadata["batches_consumed"])
+        .table_valued(column("value", JSONB))
+        .lateral("entry")
+    )
+    is_legacy = func.jsonb_typeof(entry.c.value) == "object"
+    batch_id = cast(
+        case((is_legacy, entry.c.value["batch_id"].astext), else_=entry.c.value[0].astext),
+        UUID(as_uuid=True),
+    )
+    amount = case(
+        (is_legacy, cast(entry.c.value["amount"].astext, Numeric(10, 2))),
+        else_=cast(entry.c.value[1].astext, BigInteger) / _CREDIT_MINOR_UNITS,
+    )
+    return (
+        select(batch_id.label("batch_id"), amount.label("amount"))
+        .select_from(CreditUsageLog)
+        .join(entry, true())
+        .where(CreditUsageLog.id == usage_log_id)
+        .subquery("entries")
+    )
+
+
+# Active pricing changes rarely (operator edits to credit_pricing), so each
+# worker keeps a short-lived copy instead of querying it on every request.
+# Staleness window: the app never writes credit_pricing itself (prices are
+# changed by migrations or direct SQL), so after a price change every worker
+# keeps charging the old price until its copy expires, up to
+# PRICING_CACHE_TTL_SECONDS later. Set it to 0 to read pricing on every request.
+_PRICING_TTL_SECONDS = float(os.getenv("PRICING_CACHE_TTL_SECONDS", "60"))
+_pricing_cache: Optional[tuple[float, dict[str, Decimal]]] = None
+
+
+def invalidate_pricing_cache() -> None:
+    """Drop this worker's cached pricing so the next lookup hits the database.
+
+    Only affects the calling process; any code path that writes
+    credit_pricing in-process must call it.
+    """
+    global _pricing_cache
+    _pricing_cache = None
+
+
 class InsufficientCreditsError(Exception):
     def __init__(self, balance: Decimal, required: Decimal):
         self.balance = balance
@@ -34,13 +96,30 @@ class CreditService:
 
     def __init__(self, session: AsyncSession):
         self._session = session
+        # Services are per request, so this memo spans exactly one request.
+        self._pricing: Optional[dict[str, Decimal]] = None
+
+    # Hot single-table statements are built with lambda_stmt so SQLAlchemy
+    # caches their construction and compiled form across calls; only the
+    # closure values (user and log ids) are re-bound per execution.
 
     async def get_pricing(self) -> dict[str, Decimal]:
+        global _pricing_cache
+        if self._pricing is not None:
+            return dict(self._pricing)
+
+        now = time.monotonic()
+        if _pricing_cache is not None and _pricing_cache[0] > now:
+            self._pricing = _pricing_cache[1]
+            return dict(self._pricing)
+
         result = await self._session.execute(
-            select(CreditPricing).where(CreditPricing.is_active.is_(True))
+            lambda_stmt(lambda: select(CreditPricing).where(CreditPricing.is_active.is_(True)))
         )
         rows = result.scalars().all()
-        return {row.operation: row.credit_cost for row in rows}
+        self._pricing = {row.operation: row.credit_cost for row in rows}
+        _pricing_cache = (now + _PRICING_TTL_SECONDS, self._pricing)
+        return dict(self._pricing)
 
     async def calculate_story_cost(self) -> Decimal:
         pricing = await self.get_pricing()
@@ -49,6 +128,8 @@ class CreditService:
     async def calculate_book_cost(
         self, pages: int, with_images: bool, image_model: str | None = None,
     ) -> Decimal:
+        if pages <= 0:
+            return Decimal("0")
         pricing = await self.get_pricing()
         if not with_images:
             key = "page_without_images"
@@ -62,10 +143,52 @@ class CreditService:
 
     async def get_balance(self, user_id: uuid.UUID) -> Decimal:
         result = await self._session.execute(
+            lambda_stmt(lambda: select(UserBalance.balance).where(UserBalance.user_id == user_id))
+        )
+        balance = result.scalar_one_or_none()
+        if balance is not None:
+            return balance
+
+        # No balance row: the trigger only creates one on the user's first
+        # ledger change, and ledgers older than user_balances get theirs from
+        # scripts/backfill_user_balances.py. Sum the batches directly.
+        result = await self._session.execute(
+            lambda_stmt(
+                lambda: select(func.coalesce(func.sum(UserCredits.remaining_amount), 0))
+                .where(UserCredits.user_id == user_id, UserCredits.is_refunded.is_(False))
+            )
+        )
+        return result.scalar_one()
+
+    async def rebuild_balance(self, user_id: uuid.UUID) -> Decimal:
+        """Recompute a user's user_balances row from their batches and commit.
+
+        Idempotent; overwrites whatever the row held. The balance row is
+        locked before summing, so trigger updates from concurrent ledger
+        writes either land before the sum sees them or wait and apply on top.
+        """
+        await self._session.execute(
+            pg_insert(UserBalance)
+            .values(user_id=user_id, balance=0)
+            .on_conflict_do_nothing(index_elements=[UserBalance.user_id])
+        )
+        await self._session.execute(
+            select(UserBalance.user_id).where(UserBalance.user_id == user_id).with_for_update()
+        )
+        balance = (
             select(func.coalesce(func.sum(UserCredits.remaining_amount), 0))
             .where(UserCredits.user_id == user_id, UserCredits.is_refunded.is_(False))
+            .scalar_subquery()
         )
-        return result.scalar_one()
+        result = await self._session.execute(
+            update(UserBalance)
+            .where(UserBalance.user_id == user_id)
+            .values(balance=balance, updated_at=func.now())
+            .returning(UserBalance.balance)
+        )
+        rebuilt = result.scalar_one()
+        await self._session.commit()
+        return rebuilt
 
     async def get_usage_logs(
         self,
@@ -107,92 +230,176 @@ class CreditService:
         if amount <= 0:
             return None
 
-        result = await self._session.execute(
-            select(UserCredits)
+        # The whole reservation is one statement: lock the user's batches,
+        # derive per-batch take amounts from a running total, apply them, and
+        # insert the usage log with the consumed batches aggregated into its
+        # metadata. Nothing is touched unless the total covers `amount`.
+        # FIFO arithmetic runs on bigint minor units; only the final UPDATE
+        # converts a take back to the Numeric column's scale.
+        amount_minor = int((amount * _CREDIT_MINOR_UNITS).to_integral_value())
+        locked = (
+            select(
+                UserCredits.id,
+                cast(func.round(UserCredits.remaining_amount * _CREDIT_MINOR_UNITS), BigInteger).label("remaining"),
+                UserCredits.created_at,
+            )
             .where(UserCredits.user_id == user_id, UserCredits.remaining_amount > 0, UserCredits.is_refunded.is_(False))
-            .order_by(UserCredits.created_at.asc())
-            .with_for_update()
+            .order_by(UserCredits.created_at.asc(), UserCredits.id.asc())
+            .with_for_update(of=UserCredits)
+            .cte("locked")
+        )
+        ordered = select(
+            locked.c.id,
+            locked.c.remaining,
+            cast(
+                func.sum(locked.c.remaining).over(order_by=(locked.c.created_at.asc(), locked.c.id.asc())),
+                BigInteger,
+            ).label("running"),
+            cast(func.sum(locked.c.remaining).over(), BigInteger).label("total"),
+        ).cte("ordered")
+        already_taken = ordered.c.running - ordered.c.remaining
+        consumed = select(
+            ordered.c.id,
+            func.least(ordered.c.remaining, amount_minor - already_taken).label("take"),
+        ).where(ordered.c.total >= amount_minor, already_taken < amount_minor).cte("consumed")
+        applied = (
+            update(UserCredits)
+            .where(UserCredits.id == consumed.c.id)
+            .values(
+                remaining_amount=UserCredits.remaining_amount - consumed.c.take / _CREDIT_MINOR_UNITS,
+                updated_at=func.now(),
+            )
+            .returning(UserCredits.id, consumed.c.take)
+            .cte("applied")
         )
-        batches = result.scalars().all()
-
-        total_available = sum(b.remaining_amount for b in batches)
-        if total_available < amount:
-            raise InsufficientCreditsError(balance=total_available, required=amount)
-
-        remaining_to_consume = amount
-        batches_consumed = []
-        for batch in batches:
-            if remaining_to_consume <= 0:
-                break
-            consume = min(batch.remaining_amount, remaining_to_consume)
-            batch.remaining_amount -= consume
-            remaining_to_consume -= consume
-            batches_consumed.append({"batch_id": str(batch.id), "amount": str(consume)})
 
         # Sanitize metadata keys
         safe_metadata = {k: v for k, v in metadata.items() if k in self.ALLOWED_METADATA_KEYS}
-        metadata_with_batches = {**safe_metadata, "batches_consumed": batches_consumed}
-        usage_log = CreditUsageLog(
-            user_id=user_id, job_id=job_id, job_type=job_type,
-            credits_used=amount, status="reserved", description=description,
-            extra_metadata=metadata_with_batches,
-            reserved_at=datetime.now(timezone.utc),
-        )
-        self._session.add(usage_log)
+        # Compact entries: [batch uuid hex, amount in minor units]
+        batches_consumed = func.jsonb_agg(
+            func.jsonb_build_array(
+                func.replace(cast(applied.c.id, Text), "-", ""),
+                applied.c.take,
+            )
+        )
+        metadata_with_batches = literal(safe_metadata, JSONB).op("||", return_type=JSONB)(
+            func.jsonb_build_object("batches_consumed", batches_consumed)
+        )
+        usage_log_id = uuid.uuid4()
+        inserted = (
+            insert(CreditUsageLog)
+            .from_select(
+                [
+                    CreditUsageLog.id, CreditUsageLog.user_id, CreditUsageLog.job_id,
+                    CreditUsageLog.job_type, CreditUsageLog.credits_used, CreditUsageLog.status,
+                    CreditUsageLog.description, CreditUsageLog.extra_metadata,
+                    CreditUsageLog.reserved_at, CreditUsageLog.created_at, CreditUsageLog.updated_at,
+                ],
+                select(
+                    literal(usage_log_id, UUID(as_uuid=True)),
+                    literal(user_id, UUID(as_uuid=True)),
+                    literal(job_id, UUID(as_uuid=True)),
+                    literal(job_type),
+                    literal(amount, Numeric(10, 2)),
+                    literal("reserved"),
+                    literal(description, Text),
+                    metadata_with_batches,
+                    func.now(), func.now(), func.now(),
+                )
+                .select_from(applied)
+                .having(func.count() > 0),
+            )
+            .returning(CreditUsageLog.id)
+            .cte("inserted")
+        )
+        # One row back either way: the new log id (NULL when nothing was
+        # consumed) and the total available across the locked batches, so
+        # the insufficient-credits path needs no second query.
+        result = await self._session.execute(
+            select(
+                select(inserted.c.id).scalar_subquery().label("usage_log_id"),
+                func.coalesce(select(func.max(ordered.c.total)).scalar_subquery(), 0).label("available"),
+            )
+        )
+        reserved_id, available_minor = result.one()
+        if reserved_id is None:
+            raise InsufficientCreditsError(
+                balance=Decimal(available_minor).scaleb(-_CREDIT_SCALE), required=amount,
+            )
         await self._session.commit()
-        await self._session.refresh(usage_log)
 
-        logger.info(f"Reserved {amount} credits for user {user_id}, job {job_id} ({job_type}), usage_log={usage_log.id}")
-        return usage_log.id
+        logger.info(f"Reserved {amount} credits for user {user_id}, job {job_id} ({job_type}), usage_log={usage_log_id}")
+        return usage_log_id
 
     async def confirm(self, usage_log_id: Optional[uuid.UUID], user_id: Optional[uuid.UUID] = None) -> None:
         if usage_log_id is None:
             return
-        query = select(CreditUsageLog).where(CreditUsageLog.id == usage_log_id).with_for_update()
+        # Conditional UPDATE: the status check and transition happen in one
+        # statement, which takes its own row lock.
+        stmt = lambda_stmt(
+            lambda: update(CreditUsageLog)
+            .where(CreditUsageLog.id == usage_log_id, CreditUsageLog.status == "reserved")
+            .values(status="confirmed")
+        )
         if user_id is not None:
-            query = query.where(CreditUsageLog.user_id == user_id)
-        result = await self._session.execute(query)
-        log = result.scalar_one_or_none()
-        if not log or log.status != "reserved":
+            stmt += lambda s: s.where(CreditUsageLog.user_id == user_id)
+        result = await self._session.execute(
+            stmt, execution_options={"synchronize_session": False}
+        )
+        if result.rowcount == 0:
             return
-        log.status = "confirmed"
         await self._session.commit()
         logger.info(f"Confirmed credit usage {usage_log_id}")
 
     async def release(self, usage_log_id: Optional[uuid.UUID], user_id: Optional[uuid.UUID] = None) -> None:
         if usage_log_id is None:
             return
-        query = select(CreditUsageLog).where(CreditUsageLog.id == usage_log_id).with_for_update()
+        # Conditional UPDATE as in confirm(): the status transition locks the
+        # log, so a concurrent confirm/release can't also act on it.
+        stmt = (
+            update(CreditUsageLog)
+            .where(CreditUsageLog.id == usage_log_id, CreditUsageLog.status == "reserved")
+            .values(status="released")
+            .returning(CreditUsageLog.credits_used)
+        )
         if user_id is not None:
-            query = query.where(CreditUsageLog.user_id == user_id)
-        result = await self._session.execute(query)
-        log = result.scalar_one_or_none()
-        if not log or log.status != "reserved":
+            stmt = stmt.where(CreditUsageLog.user_id == user_id)
+        result = await self._session.execute(stmt, execution_options={"synchronize_session": False})
+        credits_used = result.scalar_one_or_none()
+        if credits_used is None:
             return
 
-        batches_consumed = (log.extra_metadata or {}).get("batches_consumed", [])
-        for entry in batches_consumed:
-            batch_result = await self._session.execute(
-                select(UserCredits).where(UserCredits.id == uuid.UUID(entry["batch_id"])).with_for_update()
-            )
-            batch = batch_result.scalar_one_or_none()
-            if batch:
-                batch.remaining_amount += Decimal(entry["amount"])
-
-        log.status = "released"
+        # batches_consumed is expanded and decoded by Postgres and applied to
+        # every batch it names in one UPDATE ... FROM, so the JSONB column is
+        # never loaded into Python.
+        entries = _batches_consumed_entries(usage_log_id)
+        await self._session.execute(
+            update(UserCredits)
+            .where(UserCredits.id == entries.c.batch_id)
+            .values(
+                remaining_amount=UserCredits.remaining_amount + entries.c.amount,
+                updated_at=func.now(),
+            ),
+            execution_options={"synchronize_session": False},
+        )
         await self._session.commit()
-        logger.info(f"Released {log.credits_used} credits for usage {usage_log_id}")
+        logger.info(f"Released {credits_used} credits for usage {usage_log_id}")
 
     async def cleanup_stale_reservations(self, ttl_minutes: int = 30) -> int:
-        from datetime import timedelta
-        cutoff = datetime.now(timezone.utc) - timedelta(minutes=ttl_minutes)
+        # Cutoff is computed by Postgres against its own clock, matching the
+        # func.now() used to stamp reserved_at.
+        cutoff = func.now() - func.make_interval(0, 0, 0, 0, 0, ttl_minutes)
+        # SKIP LOCKED: logs currently locked by a live confirm/release are
+        # left to that task instead of stalling the janitor behind it.
         result = await self._session.execute(
-            select(CreditUsageLog).where(CreditUsageLog.status == "reserved", CreditUsageLog.reserved_at < cutoff)
+            select(CreditUsageLog.id)
+            .where(CreditUsageLog.status == "reserved", CreditUsageLog.reserved_at < cutoff)
+            .with_for_update(skip_locked=True)
         )
-        stale_logs = result.scalars().all()
+        stale_log_ids = result.scalars().all()
         count = 0
-        for log in stale_logs:
-            await self.release(log.id)
+        for log_id in stale_log_ids:
+            await self.release(log_id)
             count += 1
         if count > 0:
             logger.warning(f"Cleaned up {count} stale credit reservations")
@@ -1,7 +1,10 @@
 """Shared helpers for background tasks."""
 
+import asyncio
+import contextlib
 import logging
 import uuid
+from typing import Awaitable, Callable, Optional
 
 from src.services.credit_service import CreditService
 
@@ -10,11 +13,14 @@ logger = logging.getLogger(__name__)
 
 
 async def safe_release_credits(
-    session, usage_log_id: uuid.UUID, user_id: uuid.UUID, job_id: str,
+    credit_service: CreditService, usage_log_id: uuid.UUID, user_id: uuid.UUID, job_id: str,
 ) -> None:
-    """Release reserved credits, logging but not raising on failure."""
+    """Release reserved credits, logging but not raising on failure.
+
+    Takes the caller's CreditService so a task builds one per session
+    and reuses it for both confirm and release.
+    """
     try:
-        credit_service = CreditService(session)
         await credit_service.release(usage_log_id, user_id)
         logger.info(f"[{job_id}] Credits released: usage_log={usage_log_id}")
     except Exception as release_err:
@@ -22,3 +28,90 @@ async def safe_release_credits(
             f"[{job_id}] Failed to release credits: usage_log={usage_log_id}, user={user_id}, error={release_err}",
             exc_info=True,
         )
+
+
+class ProgressWriter:
+    """Write cosmetic job progress in the background.
+
+    post() never awaits: a worker task writes the latest posted message at
+    most once per ``interval`` using its own session, dropping any it was
+    superseded by. Status transitions stay inline in the task; call
+    flush() before them so a queued message can't land afterwards.
+
+    Usage::
+
+        async with ProgressWriter(session_factory, repo.update_book_job, job_uuid) as progress:
+            progress.post("Generating PDF files...")
+            ...
+            await progress.flush()
+            await repo.update_book_job(session, job_uuid, status="completed", ...)
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        update_fn: Callable[..., Awaitable[None]],
+        job_id: uuid.UUID,
+        interval: float = 0.5,
+    ) -> None:
+        self._session_factory = session_factory
+        self._update_fn = update_fn
+        self._job_id = job_id
+        self._interval = interval
+        self._pending: Optional[str] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "ProgressWriter":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # Drop anything unwritten: on success flush() already ran, and on
+        # failure the error handler records its own progress message.
+        await self._stop()
+        self._pending = None
+
+    def post(self, progress: str) -> None:
+        self._pending = progress
+        self._wakeup.set()
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def flush(self) -> None:
+        """Stop the worker and write any message it hasn't written yet."""
+        await self._stop()
+        await self._write_pending()
+
+    async def _stop(self) -> None:
+        # Signal the worker rather than cancelling it, so a write already in
+        # flight completes instead of being torn down mid-statement.
+        if self._worker is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._worker
+        self._worker = None
+        self._stopping.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                return
+            await self._write_pending()
+            # Wait out the interval, but return early once asked to stop
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._stopping.wait(), self._interval)
+                return
+
+    async def _write_pending(self) -> None:
+        progress, self._pending = self._pending, None
+        if progress is None:
+            return
+        try:
+            async with self._session_factory() as session:
+                await self._update_fn(session, self._job_id, progress=progress)
+        except Exception as e:
+            logger.warning(f"[{self._job_id}] Failed to write progress '{progress}': {e}")
@@ -5,28 +5,94 @@ Extracted from src/api/routes/books.py to keep route handlers thin.
 """
 
 import asyncio
+import contextlib
+import functools
 import logging
+import multiprocessing
+import os
+import re
 import tempfile
 import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
 from src.api.schemas import BookGenerateRequest
-from src.core.config import LLMConfig, DEFAULT_MAX_SENTENCES_PER_PAGE, DEFAULT_MAX_CHARS_PER_PAGE
-from src.core.image_generator import BookImageGenerator as _BIG
+from src.core.config import LLMConfig, DEFAULT_IMAGE_MODEL, DEFAULT_MAX_SENTENCES_PER_PAGE, DEFAULT_MAX_CHARS_PER_PAGE
+from src.core.image_generator import (
+    BookImageGenerator,
+    GeneratedImage,
+    ImageConfig,
+    ImageGenerationError,
+    OpenRouterImageGenerator,
+)
 from src.core.llm_connector import analyze_story_for_visuals
-from src.core.text_processor import TextProcessor, validate_book_content
-from src.core.pdf_generator import generate_both_pdfs
+from src.core.text_processor import BookContent, PageType, TextProcessor, validate_book_content
+from src.core.pdf_generator import PageImage, render_booklet_pdf, render_review_pdf
+from src.core.retry import async_retry
 from src.core.storage import get_storage, build_image_r2_key, build_pdf_r2_key
 from src.db.engine import get_session_factory
 from src.db import repository as repo
 from src.services.credit_service import CreditService
-from src.tasks._common import safe_release_credits
+from src.tasks._common import ProgressWriter, safe_release_credits
 
 
 logger = logging.getLogger(__name__)
 
 TASK_TIMEOUT_SECONDS = 1200  # 20 minutes
+R2_MAX_CONCURRENCY = 16  # concurrent R2 requests per task
+IMAGE_RETRY_CONCURRENCY = 4  # concurrent image-model requests when retrying failed pages
+CACHE_CHECK_CONCURRENCY = 4  # image-cache lookup sessions open at once per job
+
+# Anything but letters, digits, space, '-' and '_' (\w is Unicode-aware,
+# so non-Latin titles keep their letters)
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^\w \-]")
+
+
+# PDF rendering is CPU-bound; worker processes keep it off the event loop's
+# GIL and let concurrent jobs use separate cores. Created on first use.
+_pdf_executor: ProcessPoolExecutor | None = None
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    if _pdf_executor is None:
+        # spawn: forking a process that runs an event loop and thread pools is unsafe
+        _pdf_executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    """Stop the PDF worker processes. Call once at app shutdown."""
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown(wait=False, cancel_futures=True)
+        _pdf_executor = None
+
+
+async def _gather_bounded(aws, limit: int) -> list:
+    """Like asyncio.gather, but with at most `limit` awaitables in flight.
+
+    Runs them in a TaskGroup: if one raises, the others are cancelled and
+    awaited before its exception propagates, so none outlive the call.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(aw):
+        async with semaphore:
+            return await aw
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_run(aw)) for aw in aws]
+    except ExceptionGroup as eg:
+        # Surface the first failure itself; its message becomes the job error
+        raise eg.exceptions[0] from eg
+    return [task.result() for task in tasks]
 
 
 def _build_book_content(request: BookGenerateRequest, job_id: str = ""):
@@ -55,9 +121,7 @@ def _build_book_content(request: BookGenerateRequest, job_id: str = ""):
 
 def _build_pdf_filenames(title: str) -> tuple[str, str]:
     """Build sanitized booklet and review filenames from a title."""
-    safe_title = "".join(
-        c if c.isalnum() or c in " -_" else "_" for c in title
-    )
+    safe_title = _UNSAFE_FILENAME_CHARS.sub("_", title)
     safe_title = safe_title.strip().replace(" ", "_")[:50]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     return (
@@ -66,52 +130,139 @@ def _build_pdf_filenames(title: str) -> tuple[str, str]:
     )
 
 
+def _make_cache_check_fn(session_factory):
+    """Build the DB-backed cross-book cache lookup for one job.
+
+    Each lookup uses its own short-lived session because asyncio.gather()
+    runs them concurrently and a single async session cannot handle
+    concurrent operations; at most CACHE_CHECK_CONCURRENCY are open at
+    once, so a large book doesn't take a pool connection per page.
+    Lookups are memoized per job as tasks, so pages with the same prompt
+    share one query; a book has at most a few dozen pages.
+    """
+    lookups: dict[tuple[str, ...], asyncio.Task] = {}
+    sessions = asyncio.Semaphore(CACHE_CHECK_CONCURRENCY)
+
+    async def _find(prompt_hashes: tuple[str, ...]):
+        async with sessions, session_factory() as cache_session:
+            return await repo.find_cached_image_by_hash(cache_session, *prompt_hashes)
+
+    async def cache_check_fn(*prompt_hashes: str):
+        if prompt_hashes not in lookups:
+            lookups[prompt_hashes] = asyncio.create_task(_find(prompt_hashes))
+        return await asyncio.shield(lookups[prompt_hashes])
+
+    return cache_check_fn
+
+
+def _page_image_path(directory: str, page_num: int) -> str:
+    return str(Path(directory, f"page_{page_num}.png"))
+
+
+def _write_page_images(directory: str, images: dict[int, PageImage]) -> dict[int, str]:
+    """Write in-memory page images into directory and return {page_number: path}.
+
+    Images that are already file paths are passed through.
+    """
+    paths = {}
+    for page_num, image in images.items():
+        if isinstance(image, str):
+            paths[page_num] = image
+            continue
+        path = _page_image_path(directory, page_num)
+        Path(path).write_bytes(image)
+        paths[page_num] = path
+    return paths
+
+
 async def _generate_and_upload_pdfs(
     job_id: str, book_content, request: BookGenerateRequest,
-    images: dict | None, storage,
+    images: dict[int, PageImage] | None, storage,
 ) -> tuple[str, str, int, int]:
     """Generate both PDFs, upload to R2, and return (booklet_filename, review_filename, booklet_size, review_size)."""
     booklet_filename, review_filename = _build_pdf_filenames(book_content.title)
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        booklet_path = str(Path(tmp_dir) / booklet_filename)
-        review_path = str(Path(tmp_dir) / review_filename)
-        await asyncio.to_thread(
-            generate_both_pdfs,
-            content=book_content,
-            booklet_path=booklet_path,
-            review_path=review_path,
-            config=request,
-            images=images,
+    # Render the booklet and review in two worker processes so they run in
+    # parallel and don't hold this process's GIL. Page images reach them as
+    # temp file paths rather than being pickled through the pool, and the
+    # PDFs are written to temp files that upload_file streams to R2.
+    loop = asyncio.get_running_loop()
+    with tempfile.TemporaryDirectory(prefix="book_pdfs_") as work_dir:
+        image_paths = (
+            await asyncio.to_thread(_write_page_images, work_dir, images) if images else None
         )
-        booklet_r2_key = build_pdf_r2_key(job_id, booklet_filename)
-        review_r2_key = build_pdf_r2_key(job_id, review_filename)
+        booklet_path = str(Path(work_dir, "booklet.pdf"))
+        review_path = str(Path(work_dir, "review.pdf"))
+        executor = _get_pdf_executor()
+        await asyncio.gather(*(
+            loop.run_in_executor(
+                executor,
+                functools.partial(
+                    render, content=book_content, output_path=path, config=request, images=image_paths,
+                ),
+            )
+            for render, path in ((render_booklet_pdf, booklet_path), (render_review_pdf, review_path))
+        ))
         booklet_size, review_size = await asyncio.gather(
-            storage.upload_file(booklet_path, booklet_r2_key, "application/pdf"),
-            storage.upload_file(review_path, review_r2_key, "application/pdf"),
+            storage.upload_file(booklet_path, build_pdf_r2_key(job_id, booklet_filename), "application/pdf"),
+            storage.upload_file(review_path, build_pdf_r2_key(job_id, review_filename), "application/pdf"),
         )
     return booklet_filename, review_filename, booklet_size, review_size
 
 
-async def _store_pdf_metadata(
-    session, job_id: str, user_id: uuid.UUID,
+def _build_pdf_rows(
+    job_id: str, job_uuid: uuid.UUID, user_id: uuid.UUID,
     book_content, booklet_filename: str, review_filename: str,
     booklet_size: int, review_size: int,
-) -> None:
-    """Create DB records for both generated PDFs."""
-    for pdf_type, filename, size in [
-        ("booklet", booklet_filename, booklet_size),
-        ("review", review_filename, review_size),
-    ]:
-        await repo.create_generated_pdf(
-            session,
-            book_job_id=uuid.UUID(job_id),
-            user_id=user_id,
-            pdf_type=pdf_type,
-            filename=filename,
-            file_path=build_pdf_r2_key(job_id, filename),
-            page_count=book_content.total_pages,
-            file_size_bytes=size,
-        )
+) -> list[dict]:
+    """Build the generated_pdfs rows for both PDFs of a job."""
+    return [
+        {
+            "book_job_id": job_uuid,
+            "user_id": user_id,
+            "pdf_type": pdf_type,
+            "filename": filename,
+            "file_path": build_pdf_r2_key(job_id, filename),
+            "page_count": book_content.total_pages,
+            "file_size_bytes": size,
+        }
+        for pdf_type, filename, size in [
+            ("booklet", booklet_filename, booklet_size),
+            ("review", review_filename, review_size),
+        ]
+    ]
+
+
+@contextlib.asynccontextmanager
+async def _cancel_on_exit(task: asyncio.Task | None):
+    """Cancel a background task if the block exits before awaiting it.
+
+    A task that already failed unawaited has its error retrieved and
+    logged, so asyncio doesn't report it as never retrieved.
+    """
+    block_error = None
+    try:
+        yield
+    except BaseException as e:
+        block_error = e
+        raise
+    finally:
+        if task is not None:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task_error = task.exception()
+                if task_error is not None and task_error is not block_error:
+                    logger.warning(f"Abandoned background task had failed: {task_error!r}")
+
+
+async def _in_own_session(session_factory, fn):
+    """Await fn(session) on a short-lived session of its own.
+
+    Lets independent writes run under _gather_bounded(), which a single
+    async session can't serve concurrently.
+    """
+    async with session_factory() as own_session:
+        return await fn(own_session)
 
 
 async def _generate_book_inner(
@@ -119,187 +270,180 @@ async def _generate_book_inner(
     usage_log_id: uuid.UUID | None, session, session_factory, storage,
 ) -> None:
     """Inner logic for generate_book_task, extracted for timeout wrapping."""
+    job_uuid = uuid.UUID(job_id)
     await repo.update_book_job(
-        session, uuid.UUID(job_id),
+        session, job_uuid,
         status="processing", progress="Starting book generation...",
     )
 
     story_text = request.story
-
-    logger.info(f"[{job_id}] Book settings: age {request.age_min}-{request.age_max}, language: {request.language}")
-
     llm_config = LLMConfig()
 
-    # Process text into pages (story text used as-is)
-    logger.info(f"[{job_id}] Processing text into pages...")
-    await repo.update_book_job(
-        session, uuid.UUID(job_id),
-        progress="Processing text into pages...",
-    )
-    book_content = _build_book_content(request, job_id)
-
-    await repo.update_book_job(
-        session, uuid.UUID(job_id),
-        title=book_content.title,
-        total_pages=book_content.total_pages,
-    )
-    logger.info(f"[{job_id}] Book content created: '{book_content.title}', {book_content.total_pages} pages")
-
-    # Validate
-    warnings = validate_book_content(book_content)
-    if warnings:
-        logger.warning(f"[{job_id}] Content warnings: {warnings}")
-        await repo.update_book_job(
-            session, uuid.UUID(job_id),
-            progress=f"Warnings: {', '.join(warnings)}",
+    # Story analysis needs only the raw story: start the LLM call now so it
+    # overlaps text processing, and await it when images need it.
+    visual_task = None
+    if request.generate_images and llm_config.validate():
+        logger.info(f"[{job_id}] Analyzing story for visual context...")
+        visual_task = asyncio.create_task(
+            analyze_story_for_visuals(story=story_text, config=llm_config)
         )
 
-    # Generate images if requested
-    images = None
-    visual_context = None
-    if request.generate_images:
-        from src.core.image_generator import ImageConfig, BookImageGenerator
+    # Progress pings go through a background writer; only status
+    # transitions are awaited inline.
+    async with (
+        ProgressWriter(session_factory, repo.update_book_job, job_uuid) as progress,
+        _cancel_on_exit(visual_task),
+    ):
+        logger.info(f"[{job_id}] Book settings: age {request.age_min}-{request.age_max}, language: {request.language}")
 
-        logger.info(f"[{job_id}] Starting image generation...")
-        await repo.update_book_job(
-            session, uuid.UUID(job_id),
-            progress="Analyzing story for visual consistency...",
-        )
-
-        # Analyze story for visual context (characters, setting, etc.)
-        if llm_config.validate():
-            logger.info(f"[{job_id}] Analyzing story for visual context...")
-            visual_context, analysis_response = await analyze_story_for_visuals(
-                story=story_text,
-                config=llm_config,
-            )
-            if analysis_response.success and not visual_context.is_empty():
-                logger.info(f"[{job_id}] Visual context extracted: {len(visual_context.characters)} characters, setting: {visual_context.setting[:50] if visual_context.setting else 'N/A'}...")
-                # Use suggested background color if not specified in request
-                if not request.background_color and visual_context.background_color:
-                    request.background_color = visual_context.background_color
-            else:
-                logger.warning(f"[{job_id}] Could not extract visual context: {analysis_response.error if not analysis_response.success else 'empty response'}")
-        else:
-            logger.warning(f"[{job_id}] No API key for story analysis, skipping visual context")
+        # Process text into pages (story text used as-is)
+        logger.info(f"[{job_id}] Processing text into pages...")
+        progress.post("Processing text into pages...")
+        book_content = _build_book_content(request, job_id)
 
         await repo.update_book_job(
-            session, uuid.UUID(job_id),
-            progress="Generating AI illustrations...",
+            session, job_uuid,
+            title=book_content.title,
+            total_pages=book_content.total_pages,
+            book_content_json=book_content.to_dict(),
         )
+        logger.info(f"[{job_id}] Book content created: '{book_content.title}', {book_content.total_pages} pages")
+
+        # Validate
+        warnings = validate_book_content(book_content)
+        if warnings:
+            logger.warning(f"[{job_id}] Content warnings: {warnings}")
+            progress.post(f"Warnings: {', '.join(warnings)}")
+
+        # Generate images if requested
+        images = None
+        visual_context = None
+        if request.generate_images:
+            logger.info(f"[{job_id}] Starting image generation...")
+            progress.post("Analyzing story for visual consistency...")
+
+            # Visual context (characters, setting, etc.) from the analysis started above
+            if visual_task is not None:
+                visual_context, analysis_response = await visual_task
+                if analysis_response.success and not visual_context.is_empty():
+                    logger.info(f"[{job_id}] Visual context extracted: {len(visual_context.characters)} characters, setting: {visual_context.setting[:50] if visual_context.setting else 'N/A'}...")
+                    # Use suggested background color if not specified in request
+                    if not request.background_color and visual_context.background_color:
+                        request.background_color = visual_context.background_color
+                else:
+                    logger.warning(f"[{job_id}] Could not extract visual context: {analysis_response.error if not analysis_response.success else 'empty response'}")
+            else:
+                logger.warning(f"[{job_id}] No API key for story analysis, skipping visual context")
 
-        image_config = ImageConfig(
-            model=request.image_model,
-            image_style=request.image_style,
-            use_cache=request.use_image_cache,
-            text_on_image=request.text_on_image,
-        )
+            progress.post("Generating AI illustrations...")
 
-        if image_config.validate():
-            logger.info(f"[{job_id}] Image config valid, model: {request.image_model}")
-
-            # DB-backed cache check function for cross-book cache.
-            # Uses its own session per call because asyncio.gather()
-            # runs these concurrently and a single async session
-            # cannot handle concurrent operations.
-            async def cache_check_fn(prompt_hash: str):
-                async with session_factory() as cache_session:
-                    return await repo.find_cached_image_by_hash(cache_session, prompt_hash)
-
-            async with BookImageGenerator(
-                image_config,
-                request,
-                visual_context,
-                storage=storage,
-                book_job_id=job_id,
-                cache_check_fn=cache_check_fn,
-            ) as image_generator:
-                page_data = [
-                    {
-                        "page_number": p.page_number,
-                        "content": p.content,
-                        "page_type": p.page_type.value,
-                    }
-                    for p in book_content.pages
-                ]
+            image_config = ImageConfig(
+                model=request.image_model,
+                image_style=request.image_style,
+                use_cache=request.use_image_cache,
+                text_on_image=request.text_on_image,
+            )
 
-                story_context = " ".join(
-                    [
-                        p.content
+            if image_config.validate():
+                logger.info(f"[{job_id}] Image config valid, model: {request.image_model}")
+
+                cache_check_fn = _make_cache_check_fn(session_factory)
+
+                async with BookImageGenerator(
+                    image_config,
+                    request,
+                    visual_context,
+                    storage=storage,
+                    book_job_id=job_id,
+                    cache_check_fn=cache_check_fn,
+                ) as image_generator:
+                    page_data = [
+                        {
+                            "page_number": p.page_number,
+                            "content": p.content,
+                            "page_type": p.page_type.value,
+                        }
                         for p in book_content.pages
-                        if p.page_type.value == "content"
-                    ][:3]
-                )
-
-                logger.info(f"[{job_id}] Calling generate_all_images with {len(page_data)} pages")
-                image_results = await image_generator.generate_all_images(
-                    pages=page_data,
-                    story_context=story_context,
-                )
+                    ]
+
+                    # First three content pages; islice stops scanning once they're found
+                    story_context = " ".join(
+                        islice(
+                            (p.content for p in book_content.pages if p.page_type is PageType.CONTENT),
+                            3,
+                        )
+                    )
 
-            # Create DB rows for generated images (outside context manager — generator no longer needed)
-            images = {}
-            for page_num, result in image_results.items():
-                prompt_hash = _BIG.compute_prompt_hash(result.prompt_used or "")
-                file_size = len(result.image_data) if result.image_data else None
+                    logger.info(f"[{job_id}] Calling generate_all_images with {len(page_data)} pages")
+                    image_results = await image_generator.generate_all_images(
+                        pages=page_data,
+                        story_context=story_context,
+                    )
 
+                # Create DB rows for generated images (outside context manager — generator no longer needed).
                 # NOTE: For cache hits, r2_key may reference another book's
                 # R2 namespace (e.g. "images/other-job-id/page_1.png").
                 # Any future R2 cleanup must check for shared references.
-                await repo.create_generated_image(
-                    session,
-                    book_job_id=uuid.UUID(job_id),
-                    user_id=user_id,
-                    page_number=page_num,
-                    prompt=result.prompt_used or "",
-                    prompt_hash=prompt_hash,
-                    status="completed" if result.success else "failed",
-                    r2_key=result.image_path if result.success else None,
-                    file_size_bytes=file_size,
-                    error=result.error,
-                    cached=result.cached,
-                    image_model=request.image_model,
-                )
-
-                if result.success and result.image_data:
-                    images[page_num] = result.image_data
-
-            logger.info(f"[{job_id}] Generated {len(images)} images successfully")
-        else:
-            logger.warning(f"[{job_id}] Image config invalid (missing API key?)")
-
-    # Generate PDFs
-    logger.info(f"[{job_id}] Starting PDF generation...")
-    await repo.update_book_job(
-        session, uuid.UUID(job_id),
-        progress="Generating PDF files...",
-    )
+                await repo.bulk_create_generated_images(session, [
+                    {
+                        "book_job_id": job_uuid,
+                        "user_id": user_id,
+                        "page_number": page_num,
+                        "prompt": result.prompt_used or "",
+                        "prompt_hash": result.prompt_hash or BookImageGenerator.compute_prompt_hash(result.prompt_used or ""),
+                        "status": "completed" if result.success else "failed",
+                        "r2_key": result.image_path if result.success else None,
+                        "file_size_bytes": len(result.image_data) if result.image_data else None,
+                        "error": result.error,
+                        "cached": result.cached,
+                        "image_model": request.image_model,
+                    }
+                    for page_num, result in image_results.items()
+                ])
+                images = {
+                    page_num: result.image_data
+                    for page_num, result in image_results.items()
+                    if result.success and result.image_data
+                }
+
+                logger.info(f"[{job_id}] Generated {len(images)} images successfully")
+            else:
+                logger.warning(f"[{job_id}] Image config invalid (missing API key?)")
 
-    booklet_filename, review_filename, booklet_size, review_size = (
-        await _generate_and_upload_pdfs(job_id, book_content, request, images, storage)
-    )
-    logger.info(f"[{job_id}] PDFs uploaded to R2")
+        # Generate PDFs
+        logger.info(f"[{job_id}] Starting PDF generation...")
+        progress.post("Generating PDF files...")
 
-    await _store_pdf_metadata(
-        session, job_id, user_id, book_content,
-        booklet_filename, review_filename, booklet_size, review_size,
-    )
+        booklet_filename, review_filename, booklet_size, review_size = (
+            await _generate_and_upload_pdfs(job_id, book_content, request, images, storage)
+        )
+        logger.info(f"[{job_id}] PDFs uploaded to R2")
 
-    # Update job status
-    await repo.update_book_job(
-        session, uuid.UUID(job_id),
-        status="completed",
-        progress="Book generation completed!",
-        booklet_filename=booklet_filename,
-        review_filename=review_filename,
-    )
-    logger.info(f"[{job_id}] Book generation completed successfully!")
+        pdf_rows = _build_pdf_rows(
+            job_id, job_uuid, user_id, book_content,
+            booklet_filename, review_filename, booklet_size, review_size,
+        )
 
-    # Confirm credit deduction
-    if usage_log_id:
-        credit_service = CreditService(session)
-        await credit_service.confirm(usage_log_id, user_id)
-        logger.info(f"[{job_id}] Credits confirmed: usage_log={usage_log_id}")
+        # PDF rows and job status are independent writes: run them
+        # concurrently, each on its own session. A TaskGroup cancels the
+        # sibling on failure, so nothing commits after the failure handler.
+        await progress.flush()
+        await _gather_bounded([
+            _in_own_session(session_factory, lambda s: repo.bulk_create_generated_pdfs(s, pdf_rows)),
+            _in_own_session(session_factory, lambda s: repo.update_book_job(
+                s, job_uuid,
+                status="completed",
+                progress="Book generation completed!",
+                booklet_filename=booklet_filename,
+                review_filename=review_filename,
+            )),
+        ], limit=2)
+        # Charge only once both writes have landed
+        if usage_log_id:
+            await _in_own_session(session_factory, lambda s: CreditService(s).confirm(usage_log_id, user_id))
+        logger.info(f"[{job_id}] Book generation completed successfully!")
+        if usage_log_id:
+            logger.info(f"[{job_id}] Credits confirmed: usage_log={usage_log_id}")
 
 
 async def generate_book_task(
@@ -318,6 +462,7 @@ async def generate_book_task(
         return
 
     storage = get_storage()
+    job_uuid = uuid.UUID(job_id)
 
     async with session_factory() as session:
         try:
@@ -333,13 +478,13 @@ async def generate_book_task(
             try:
                 async with session_factory() as err_session:
                     await repo.update_book_job(
-                        err_session, uuid.UUID(job_id),
+                        err_session, job_uuid,
                         status="failed",
                         error=f"Book generation timed out after {TASK_TIMEOUT_SECONDS // 60} minutes",
                         progress="Failed: generation timed out",
                     )
                     if usage_log_id:
-                        await safe_release_credits(err_session, usage_log_id, user_id, job_id)
+                        await safe_release_credits(CreditService(err_session), usage_log_id, user_id, job_id)
             except Exception as err_exc:
                 logger.error(
                     f"[{job_id}] Could not record timeout failure: {err_exc}",
@@ -350,13 +495,13 @@ async def generate_book_task(
             try:
                 async with session_factory() as err_session:
                     await repo.update_book_job(
-                        err_session, uuid.UUID(job_id),
+                        err_session, job_uuid,
                         status="failed",
                         error=str(e),
                         progress=f"Failed: {str(e)}",
                     )
                     if usage_log_id:
-                        await safe_release_credits(err_session, usage_log_id, user_id, job_id)
+                        await safe_release_credits(CreditService(err_session), usage_log_id, user_id, job_id)
             except Exception as err_exc:
                 logger.error(
                     f"[{job_id}] Could not record failure status: {err_exc}",
@@ -369,47 +514,62 @@ async def _regenerate_book_inner(
     session, session_factory, storage,
 ) -> None:
     """Inner logic for regenerate_book_task, extracted for timeout wrapping."""
+    job_uuid = uuid.UUID(job_id)
     await repo.update_book_job(
-        session, uuid.UUID(job_id),
+        session, job_uuid,
         status="processing",
         progress=f"Retrying {len(failed_images)} failed images...",
     )
 
-    from src.core.image_generator import ImageConfig, OpenRouterImageGenerator, GeneratedImage as GenImg, ImageGenerationError
-    from src.core.retry import async_retry
-    from src.core.config import DEFAULT_IMAGE_MODEL
-
-    # Retry failed images concurrently (each gets own session + generator)
-    async def _retry_one(img):
-        image_id = img.id
-        prompt = img.prompt
-        page_number = img.page_number
-        retry_attempt = img.retry_attempt + 1
-        model = img.image_model or DEFAULT_IMAGE_MODEL
-
-        logger.info(f"[{job_id}] Retrying page {page_number} (attempt #{retry_attempt}) with model {model}")
-
-        image_config = ImageConfig(model=model)
-        generator = OpenRouterImageGenerator(image_config)
-
-        @async_retry(max_attempts=3, backoff_base=2.0)
-        async def generate_with_retry(p: str) -> GenImg:
-            result = await generator.generate(p)
-            if not result.success:
-                raise ImageGenerationError(result.error or "Unknown error")
-            return result
-
-        async with session_factory() as retry_session:
-            await repo.reset_image_for_retry(retry_session, image_id, retry_attempt)
+    async with ProgressWriter(session_factory, repo.update_book_job, job_uuid) as progress:
+        # Retry failed images concurrently, capped so a book with many
+        # failures doesn't flood the image model. Retries on the same model
+        # share one generator (and its pooled HTTP client). Their row writes
+        # share the task session, one at a time, instead of checking out a
+        # pool connection per retry.
+        session_lock = asyncio.Lock()
+        generators = {
+            model: OpenRouterImageGenerator(ImageConfig(model=model))
+            for model in {img.image_model or DEFAULT_IMAGE_MODEL for img in failed_images}
+        }
+
+        async def _write(fn, *args, **kwargs):
+            async with session_lock:
+                try:
+                    await fn(session, *args, **kwargs)
+                except Exception:
+                    # A failed flush leaves the shared session unusable until
+                    # rolled back; do it here so the other retries can write
+                    await session.rollback()
+                    raise
+
+        async def _retry_one(img):
+            image_id = img.id
+            prompt = img.prompt
+            page_number = img.page_number
+            retry_attempt = img.retry_attempt + 1
+            model = img.image_model or DEFAULT_IMAGE_MODEL
+
+            logger.info(f"[{job_id}] Retrying page {page_number} (attempt #{retry_attempt}) with model {model}")
+
+            generator = generators[model]
+
+            @async_retry(max_attempts=3, backoff_base=2.0)
+            async def generate_with_retry(p: str) -> GeneratedImage:
+                result = await generator.generate(p)
+                if not result.success:
+                    raise ImageGenerationError(result.error or "Unknown error")
+                return result
 
             try:
+                await _write(repo.reset_image_for_retry, image_id, retry_attempt)
                 result = await generate_with_retry(prompt)
                 r2_key = build_image_r2_key(job_id, page_number)
                 await storage.upload_bytes(result.image_data, r2_key, "image/png")
                 file_size = len(result.image_data) if result.image_data else None
 
-                await repo.update_generated_image(
-                    retry_session, image_id,
+                await _write(
+                    repo.update_generated_image, image_id,
                     status="completed",
                     r2_key=r2_key,
                     file_size_bytes=file_size,
@@ -417,63 +577,81 @@ async def _regenerate_book_inner(
                 )
                 logger.info(f"[{job_id}] Page {page_number} retry succeeded")
 
-            except ImageGenerationError as e:
-                await repo.update_generated_image(
-                    retry_session, image_id,
-                    status="failed",
-                    error=str(e),
-                )
+            except Exception as e:
+                # Record any failure (image model, upload or DB) on this
+                # page's row so one bad page doesn't abort the other retries
                 logger.warning(f"[{job_id}] Page {page_number} retry failed: {e}")
-            finally:
-                await generator.close()
+                try:
+                    await _write(
+                        repo.update_generated_image, image_id,
+                        status="failed",
+                        error=str(e),
+                    )
+                except Exception as err_exc:
+                    logger.error(f"[{job_id}] Could not record page {page_number} failure: {err_exc}")
 
-    await asyncio.gather(*[_retry_one(img) for img in failed_images])
+        try:
+            await _gather_bounded([_retry_one(img) for img in failed_images], IMAGE_RETRY_CONCURRENCY)
+        finally:
+            await asyncio.gather(*(generator.close() for generator in generators.values()))
+
+        # Regenerate PDFs with all successful images
+        progress.post("Regenerating PDFs...")
+
+        # Get the book job to reconstruct book content
+        job = await repo.get_book_job(session, job_uuid, with_content=True)
+        if not job or not job.request_params:
+            raise RuntimeError("Cannot regenerate: job or request_params missing")
+
+        if job.book_content_json:
+            # request_params were validated when the job was submitted and
+            # are only read for PDF layout here, so skip re-validation.
+            request = BookGenerateRequest.model_construct(**job.request_params)
+            book_content = BookContent.from_dict(job.book_content_json)
+        else:
+            # Jobs generated before book_content_json was stored
+            request = BookGenerateRequest(**job.request_params)
+            book_content = _build_book_content(request, job_id)
+
+        # Stream all successful images (original + retried) into temp files
+        # concurrently, so the book's images never sit in memory together
+        completed = await repo.get_completed_image_keys(session, job_uuid)
+        with tempfile.TemporaryDirectory(prefix="book_images_") as image_dir:
+            paths = [_page_image_path(image_dir, page_num) for page_num, _ in completed]
+            sizes = await _gather_bounded(
+                [storage.download_to_file(r2_key, path) for (_, r2_key), path in zip(completed, paths)],
+                R2_MAX_CONCURRENCY,
+            )
+            images: dict[int, PageImage] = {
+                page_num: path for (page_num, _), path, size in zip(completed, paths, sizes) if size
+            }
 
-    # Regenerate PDFs with all successful images
-    await repo.update_book_job(
-        session, uuid.UUID(job_id),
-        progress="Regenerating PDFs...",
-    )
+            # Delete old PDFs from R2 and DB
+            old_r2_keys = await repo.delete_pdfs_for_book(session, job_uuid)
+            await storage.delete_many(old_r2_keys)
 
-    # Get the book job to reconstruct book content
-    job = await repo.get_book_job(session, uuid.UUID(job_id))
-    if not job or not job.request_params:
-        raise RuntimeError("Cannot regenerate: job or request_params missing")
-
-    request = BookGenerateRequest(**job.request_params)
-    book_content = _build_book_content(request, job_id)
-
-    # Gather all successful images concurrently (original + retried)
-    all_images = await repo.get_images_for_book(session, uuid.UUID(job_id))
-    completed = [(img.page_number, img.r2_key) for img in all_images if img.status == "completed" and img.r2_key]
-    downloaded = await asyncio.gather(*[storage.download_bytes(r2_key) for _, r2_key in completed])
-    images: dict[int, bytes] = {
-        page_num: data for (page_num, _), data in zip(completed, downloaded) if data
-    }
-
-    # Delete old PDFs from R2 and DB
-    old_r2_keys = await repo.delete_pdfs_for_book(session, uuid.UUID(job_id))
-    if old_r2_keys:
-        await asyncio.gather(*[storage.delete(key) for key in old_r2_keys])
-
-    # Generate new PDFs
-    booklet_filename, review_filename, booklet_size, review_size = (
-        await _generate_and_upload_pdfs(job_id, book_content, request, images, storage)
-    )
+            # Generate new PDFs
+            booklet_filename, review_filename, booklet_size, review_size = (
+                await _generate_and_upload_pdfs(job_id, book_content, request, images, storage)
+            )
 
-    await _store_pdf_metadata(
-        session, job_id, user_id, book_content,
-        booklet_filename, review_filename, booklet_size, review_size,
-    )
+        pdf_rows = _build_pdf_rows(
+            job_id, job_uuid, user_id, book_content,
+            booklet_filename, review_filename, booklet_size, review_size,
+        )
 
-    await repo.update_book_job(
-        session, uuid.UUID(job_id),
-        status="completed",
-        progress="Book regeneration completed!",
-        booklet_filename=booklet_filename,
-        review_filename=review_filename,
-    )
-    logger.info(f"[{job_id}] Book regeneration completed successfully!")
+        await progress.flush()
+        await _gather_bounded([
+            _in_own_session(session_factory, lambda s: repo.bulk_create_generated_pdfs(s, pdf_rows)),
+            _in_own_session(session_factory, lambda s: repo.update_book_job(
+                s, job_uuid,
+                status="completed",
+                progress="Book regeneration completed!",
+                booklet_filename=booklet_filename,
+                review_filename=review_filename,
+            )),
+        ], limit=2)
+        logger.info(f"[{job_id}] Book regeneration completed successfully!")
 
 
 async def regenerate_book_task(
@@ -490,6 +668,7 @@ async def regenerate_book_task(
         return
 
     storage = get_storage()
+    job_uuid = uuid.UUID(job_id)
 
     async with session_factory() as session:
         try:
@@ -505,7 +684,7 @@ async def regenerate_book_task(
             try:
                 async with session_factory() as err_session:
                     await repo.update_book_job(
-                        err_session, uuid.UUID(job_id),
+                        err_session, job_uuid,
                         status="failed",
                         error=f"Book regeneration timed out after {TASK_TIMEOUT_SECONDS // 60} minutes",
                         progress="Failed: regeneration timed out",
@@ -520,7 +699,7 @@ async def regenerate_book_task(
             try:
                 async with session_factory() as err_session:
                     await repo.update_book_job(
-                        err_session, uuid.UUID(job_id),
+                        err_session, job_uuid,
                         status="failed",
                         error=str(e),
                         progress=f"Regeneration failed: {str(e)}",
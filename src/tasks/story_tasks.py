@@ -4,7 +4,9 @@ Background tasks for story creation.
 Extracted from src/api/routes/stories.py to keep route handlers thin.
 """
 
+import asyncio
 import logging
+import os
 import uuid
 
 from src.api.schemas import StoryCreateRequest
@@ -18,15 +20,97 @@ from src.tasks._common import safe_release_credits
 
 logger = logging.getLogger(__name__)
 
+# Admission control: at most STORY_TASK_CONCURRENCY stories generate at
+# once (each holds a DB connection and an LLM request); the rest wait as
+# "pending". Past STORY_BACKLOG_MAX admitted stories, running or waiting,
+# the route refuses new ones instead of queueing them indefinitely.
+STORY_TASK_CONCURRENCY = int(os.getenv("STORY_TASK_CONCURRENCY", "8"))
+STORY_BACKLOG_MAX = int(os.getenv("STORY_BACKLOG_MAX", "64"))
+
+_story_slots: asyncio.Semaphore | None = None
+_story_backlog = 0  # stories admitted by the route and not yet finished
+
+
+def _get_story_slots() -> asyncio.Semaphore:
+    global _story_slots
+    if _story_slots is None:
+        _story_slots = asyncio.Semaphore(STORY_TASK_CONCURRENCY)
+    return _story_slots
+
+
+class StoryAdmission:
+    """A story's place in the backlog, taken by admit_story().
+
+    release() gives the place back; only the first call counts, so the
+    route's error path and the task's cleanup can both call it safely.
+    """
+
+    def __init__(self) -> None:
+        self._released = False
+
+    def release(self) -> None:
+        global _story_backlog
+        if self._released:
+            return
+        self._released = True
+        _story_backlog -= 1
+
+
+def admit_story() -> StoryAdmission | None:
+    """Count a new story toward the backlog, or return None if it is full.
+
+    Called by the route before reserving credits, so a burst of requests
+    sees each other's admissions. The route releases the admission if the
+    task is never scheduled; otherwise create_story_task releases it when
+    it finishes.
+    """
+    global _story_backlog
+    if _story_backlog >= STORY_BACKLOG_MAX:
+        return None
+    _story_backlog += 1
+    return StoryAdmission()
+
+
+async def _fail_job(
+    session, credit_service: CreditService, job_id: str, job_uuid: uuid.UUID,
+    user_id: uuid.UUID, usage_log_id: uuid.UUID | None, error: str, **fields,
+) -> None:
+    """Mark the story job failed in one update, then release any reserved credits.
+
+    Extra fields (e.g. safety_status) are written in the same update.
+    """
+    await repo.update_story_job(
+        session, job_uuid,
+        status="failed", error=error, progress=f"Failed: {error}",
+        **fields,
+    )
+    if usage_log_id:
+        await safe_release_credits(credit_service, usage_log_id, user_id, job_id)
+
 
 async def create_story_task(
     job_id: str, request: StoryCreateRequest, user_id: uuid.UUID,
     usage_log_id: uuid.UUID | None = None,
+    admission: StoryAdmission | None = None,
 ) -> None:
     """
     Background task to create a story.
     Uses its own DB session (background tasks run outside FastAPI dependency injection).
+    Waits for one of STORY_TASK_CONCURRENCY slots before starting, and
+    releases the route's admission, if given, when it finishes.
     """
+    try:
+        await _create_story_inner(job_id, request, user_id, usage_log_id)
+    finally:
+        if admission is not None:
+            admission.release()
+
+
+async def _create_story_inner(
+    job_id: str, request: StoryCreateRequest, user_id: uuid.UUID,
+    usage_log_id: uuid.UUID | None,
+) -> None:
+    """Inner logic for create_story_task."""
     logger.info(f"[{job_id}] Starting story creation task: tone={request.tone}, length={request.length}")
 
     session_factory = get_session_factory()
@@ -34,25 +118,25 @@ async def create_story_task(
         logger.error(f"[{job_id}] Database not initialized, cannot run background task")
         return
 
+    job_uuid = uuid.UUID(job_id)
+    slots = _get_story_slots()
+    acquired = False
     async with session_factory() as session:
+        credit_service = CreditService(session)
         try:
-            await repo.update_story_job(
-                session, uuid.UUID(job_id),
-                status="processing",
-                progress="Validating prompt and preparing generation...",
-            )
+            # Wait for a slot inside the try, so a task cancelled while
+            # queued still fails its job and releases its credits
+            await slots.acquire()
+            acquired = True
 
             # Initialize LLM config
             llm_config = LLMConfig()
             if not llm_config.validate():
                 logger.error(f"[{job_id}] No OpenRouter API key configured")
-                await repo.update_story_job(
-                    session, uuid.UUID(job_id),
-                    status="failed",
+                await _fail_job(
+                    session, credit_service, job_id, job_uuid, user_id, usage_log_id,
                     error="OpenRouter API key not configured. Set OPENROUTER_API_KEY in .env file.",
                 )
-                if usage_log_id:
-                    await safe_release_credits(session, usage_log_id, user_id, job_id)
                 return
 
             # Increase max_tokens for story generation (stories need more space than adaptation)
@@ -60,7 +144,8 @@ async def create_story_task(
             llm_config.temperature = 0.7  # Creative but controlled
 
             await repo.update_story_job(
-                session, uuid.UUID(job_id),
+                session, job_uuid,
+                status="processing",
                 progress="Generating your story...",
             )
             generator = StoryGenerator(llm_config)
@@ -78,21 +163,17 @@ async def create_story_task(
 
             if not result.success:
                 logger.warning(f"[{job_id}] Story generation failed: {result.error}")
-                await repo.update_story_job(
-                    session, uuid.UUID(job_id),
-                    status="failed",
+                await _fail_job(
+                    session, credit_service, job_id, job_uuid, user_id, usage_log_id,
                     error=result.error,
-                    progress=f"Failed: {result.error}",
                     safety_status=result.safety_status,
                     safety_reasoning=result.safety_reasoning,
                 )
-                if usage_log_id:
-                    await safe_release_credits(session, usage_log_id, user_id, job_id)
                 return
 
             # Success - store results
             await repo.update_story_job(
-                session, uuid.UUID(job_id),
+                session, job_uuid,
                 status="completed",
                 progress="Story created successfully!",
                 generated_title=result.title,
@@ -107,21 +188,37 @@ async def create_story_task(
 
             # Confirm credit deduction
             if usage_log_id:
-                credit_service = CreditService(session)
                 await credit_service.confirm(usage_log_id, user_id)
                 logger.info(f"[{job_id}] Credits confirmed: usage_log={usage_log_id}")
 
             logger.info(f"[{job_id}] Story created: '{result.title}', {result.page_count} pages, {result.tokens_used} tokens")
 
-        except Exception as e:
-            logger.error(f"[{job_id}] Story creation failed: {str(e)}", exc_info=True)
+        except asyncio.CancelledError:
+            # Server shutdown cancelled the task, queued or mid-run: don't
+            # leave the job pending/processing with credits held. The task
+            # session may be mid-statement, so record it on a fresh one.
+            logger.warning(f"[{job_id}] Story creation cancelled")
             try:
                 async with session_factory() as err_session:
-                    await repo.update_story_job(
-                        err_session, uuid.UUID(job_id),
-                        status="failed", error=str(e), progress=f"Failed: {str(e)}",
+                    await _fail_job(
+                        err_session, CreditService(err_session), job_id, job_uuid, user_id, usage_log_id,
+                        error="Story creation was interrupted. Please try again.",
                     )
-                    if usage_log_id:
-                        await safe_release_credits(err_session, usage_log_id, user_id, job_id)
+            except Exception as err_exc:
+                logger.error(f"[{job_id}] Could not record cancellation: {err_exc}", exc_info=True)
+            raise
+        except Exception as e:
+            logger.error(f"[{job_id}] Story creation failed: {str(e)}", exc_info=True)
+            try:
+                # Each repo write commits on its own, so rolling back only
+                # discards the failed statement and the session is reusable
+                await session.rollback()
+                await _fail_job(
+                    session, credit_service, job_id, job_uuid, user_id, usage_log_id,
+                    error=str(e),
+                )
             except Exception as err_exc:
                 logger.error(f"[{job_id}] Could not record failure: {err_exc}", exc_info=True)
+        finally:
+            if acquired:
+                slots.release()
@@ -1,21 +1,57 @@
 """API-specific test fixtures."""
 
+import uuid
+
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
 from httpx import AsyncClient, ASGITransport
 
 from src.api.app import app
+from src.api.deps import get_db, get_current_user_id
+from src.api.rate_limit import limiter
+
+
+_TEST_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
 
 @pytest.fixture
 async def async_client():
     """Async test client for FastAPI."""
-    # Patch database initialization to avoid real DB connections
-    with (
-        patch("src.api.app.init_db", new_callable=AsyncMock),
-        patch("src.api.app.close_db", new_callable=AsyncMock),
-    ):
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as client:
-            yield client
+    # ASGITransport never sends lifespan events, so init_db/close_db don't run
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def db_session():
+    """Mock AsyncSession served by the get_db override.
+
+    Test modules that need a pre-populated session override this fixture.
+    """
+    return AsyncMock()
+
+
+@pytest.fixture
+async def client(db_session):
+    """Async test client with DB and auth deps overridden."""
+
+    async def _override_db():
+        return db_session
+
+    async def _override_user():
+        return _TEST_USER_ID
+
+    app.dependency_overrides[get_db] = _override_db
+    app.dependency_overrides[get_current_user_id] = _override_user
+
+    # Disable the rate limiter so tests don't hit 429
+    limiter.enabled = False
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+    limiter.enabled = True
+    app.dependency_overrides.clear()
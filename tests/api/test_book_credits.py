@@ -2,6 +2,7 @@
 
 import uuid
 from decimal import Decimal
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -31,6 +32,8 @@ _VALID_BOOK_BODY = {
     "generate_images": True,
 }
 
+_VALID_BOOK_BODY_NO_IMAGES = {**_VALID_BOOK_BODY, "generate_images": False}
+
 _PRICING_SNAPSHOT = {
     "page_with_images": Decimal("2.00"),
     "page_without_images": Decimal("1.00"),
@@ -77,6 +80,24 @@ async def client():
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def credit_mocks(monkeypatch):
+    """Patch the route's credit calls and job creation with defaults tests can override."""
+    mocks = SimpleNamespace(
+        calc=AsyncMock(return_value=Decimal("20.00")),
+        reserve=AsyncMock(return_value=uuid.uuid4()),
+        create_job=AsyncMock(),
+    )
+    monkeypatch.setattr("src.api.routes.books.CreditService.calculate_book_cost", mocks.calc)
+    monkeypatch.setattr(
+        "src.api.routes.books.CreditService.get_pricing",
+        AsyncMock(return_value=_PRICING_SNAPSHOT),
+    )
+    monkeypatch.setattr("src.api.routes.books.CreditService.reserve", mocks.reserve)
+    monkeypatch.setattr("src.api.routes.books.repo.create_book_job", mocks.create_job)
+    return mocks
+
+
 # ---------------------------------------------------------------------------
 # Tests
 # ---------------------------------------------------------------------------
@@ -85,240 +106,92 @@ async def client():
 class TestBookCredits:
     """Tests for credit reserve/deduction in POST /api/v1/books/generate."""
 
-    async def test_generate_book_reserves_credits(self, client):
+    async def test_generate_book_reserves_credits(self, client, credit_mocks):
         """reserve() is called with amount=20.00 and job_type='book' for an 8-page structured story with images."""
-        usage_log_id = uuid.uuid4()
+        resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
 
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("20.00"),
-            ),
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ) as mock_reserve,
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ),
-        ):
-            resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
-
-            assert resp.status_code == 200
-            mock_reserve.assert_called_once()
-            call_kwargs = mock_reserve.call_args.kwargs
-            assert call_kwargs["amount"] == Decimal("20.00")
-            assert call_kwargs["job_type"] == "book"
+        assert resp.status_code == 200
+        credit_mocks.reserve.assert_called_once()
+        call_kwargs = credit_mocks.reserve.call_args.kwargs
+        assert call_kwargs["amount"] == Decimal("20.00")
+        assert call_kwargs["job_type"] == "book"
 
-    async def test_generate_book_cost_with_images(self, client):
+    async def test_generate_book_cost_with_images(self, client, credit_mocks):
         """calculate_book_cost is called with pages=10, with_images=True when generate_images=True."""
-        usage_log_id = uuid.uuid4()
+        credit_mocks.calc.return_value = Decimal("16.00")
 
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("16.00"),
-            ) as mock_calc,
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ),
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ),
-        ):
-            resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
+        resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
 
-            assert resp.status_code == 200
-            mock_calc.assert_called_once()
-            call_kwargs = mock_calc.call_args.kwargs
-            assert call_kwargs["pages"] == 10
-            assert call_kwargs["with_images"] is True
+        assert resp.status_code == 200
+        credit_mocks.calc.assert_called_once()
+        call_kwargs = credit_mocks.calc.call_args.kwargs
+        assert call_kwargs["pages"] == 10
+        assert call_kwargs["with_images"] is True
 
-    async def test_generate_book_cost_without_images(self, client):
+    async def test_generate_book_cost_without_images(self, client, credit_mocks):
         """calculate_book_cost is called with pages=10, with_images=False when generate_images=False."""
-        usage_log_id = uuid.uuid4()
-        body = {**_VALID_BOOK_BODY, "generate_images": False}
+        credit_mocks.calc.return_value = Decimal("8.00")
 
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("8.00"),
-            ) as mock_calc,
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ),
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ),
-        ):
-            resp = await client.post("/api/v1/books/generate", json=body)
+        resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY_NO_IMAGES)
 
-            assert resp.status_code == 200
-            mock_calc.assert_called_once()
-            call_kwargs = mock_calc.call_args.kwargs
-            assert call_kwargs["pages"] == 10
-            assert call_kwargs["with_images"] is False
+        assert resp.status_code == 200
+        credit_mocks.calc.assert_called_once()
+        call_kwargs = credit_mocks.calc.call_args.kwargs
+        assert call_kwargs["pages"] == 10
+        assert call_kwargs["with_images"] is False
 
-    async def test_generate_book_returns_402_insufficient(self, client):
+    async def test_generate_book_returns_402_insufficient(self, client, credit_mocks):
         """Returns 402 with correct detail when reserve raises InsufficientCreditsError."""
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("20.00"),
-            ),
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                side_effect=InsufficientCreditsError(
-                    balance=Decimal("5.00"), required=Decimal("20.00"),
-                ),
-            ),
-        ):
-            resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
+        credit_mocks.reserve.side_effect = InsufficientCreditsError(
+            balance=Decimal("5.00"), required=Decimal("20.00"),
+        )
+
+        resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
 
-            assert resp.status_code == 402
-            detail = resp.json()["detail"]
-            assert detail == {"message": "Insufficient credits", "balance": 5.0, "required": 20.0}
+        assert resp.status_code == 402
+        detail = resp.json()["detail"]
+        assert detail == {"message": "Insufficient credits", "balance": 5.0, "required": 20.0}
+        credit_mocks.create_job.assert_not_called()
 
-    async def test_structured_pages_count_used(self, client):
+    async def test_structured_pages_count_used(self, client, credit_mocks):
         """When story_structured with 8 pages is provided, calculate_book_cost receives pages=10."""
-        usage_log_id = uuid.uuid4()
+        credit_mocks.calc.return_value = Decimal("16.00")
 
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("16.00"),
-            ) as mock_calc,
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ),
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ),
-        ):
-            resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
+        resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
 
-            assert resp.status_code == 200
-            call_kwargs = mock_calc.call_args.kwargs
-            assert call_kwargs["pages"] == 10
+        assert resp.status_code == 200
+        call_kwargs = credit_mocks.calc.call_args.kwargs
+        assert call_kwargs["pages"] == 10
 
-    async def test_raw_text_uses_text_processor_page_count(self, client):
+    async def test_raw_text_uses_text_processor_page_count(self, client, credit_mocks):
         """When story_structured is absent, TextProcessor determines the page count (> 0)."""
-        usage_log_id = uuid.uuid4()
+        credit_mocks.calc.return_value = Decimal("4.00")
         body_no_structured = {
             "story": "Once upon a time there was a little bunny. The bunny hopped around. The bunny found a carrot. The end.",
             "title": "Bunny Story",
             "generate_images": True,
         }
 
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("4.00"),
-            ) as mock_calc,
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ),
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ),
-        ):
-            resp = await client.post("/api/v1/books/generate", json=body_no_structured)
+        resp = await client.post("/api/v1/books/generate", json=body_no_structured)
 
-            assert resp.status_code == 200
-            mock_calc.assert_called_once()
-            call_kwargs = mock_calc.call_args.kwargs
-            assert call_kwargs["pages"] > 0
+        assert resp.status_code == 200
+        credit_mocks.calc.assert_called_once()
+        call_kwargs = credit_mocks.calc.call_args.kwargs
+        assert call_kwargs["pages"] > 0
 
-    async def test_passes_usage_log_id_to_task(self, client):
+    async def test_passes_usage_log_id_to_task(self, client, credit_mocks):
         """The usage_log_id returned by reserve() is forwarded as the 5th positional arg to add_task."""
-        usage_log_id = uuid.uuid4()
-
-        with (
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("20.00"),
-            ),
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ),
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ),
-            patch(
-                "src.api.routes.books.BackgroundTasks.add_task",
-            ) as mock_add_task,
-        ):
+        with patch("src.api.routes.books.BackgroundTasks.add_task") as mock_add_task:
             resp = await client.post("/api/v1/books/generate", json=_VALID_BOOK_BODY)
 
-            assert resp.status_code == 200
-            mock_add_task.assert_called_once()
-            # add_task(generate_book_task, str(job_id), body, user_id, usage_log_id)
-            positional_args = mock_add_task.call_args.args
-            assert positional_args[4] == usage_log_id
+        assert resp.status_code == 200
+        mock_add_task.assert_called_once()
+        # add_task(generate_book_task, str(job_id), body, user_id, usage_log_id)
+        positional_args = mock_add_task.call_args.args
+        assert positional_args[4] == credit_mocks.reserve.return_value
 
-    async def test_slug_resolved_to_prompt_string(self, client):
+    async def test_slug_resolved_to_prompt_string(self, client, credit_mocks):
         """When image_style is a known slug, it is replaced with the DB prompt_string before job creation."""
-        usage_log_id = uuid.uuid4()
         mock_style = MagicMock()
         mock_style.prompt_string = "children's book illustration, soft watercolor style, gentle colors"
 
@@ -330,32 +203,11 @@ class TestBookCredits:
                 new_callable=AsyncMock,
                 return_value=mock_style,
             ),
-            patch(
-                "src.api.routes.books.CreditService.calculate_book_cost",
-                new_callable=AsyncMock,
-                return_value=Decimal("20.00"),
-            ),
-            patch(
-                "src.api.routes.books.CreditService.get_pricing",
-                new_callable=AsyncMock,
-                return_value=_PRICING_SNAPSHOT,
-            ),
-            patch(
-                "src.api.routes.books.CreditService.reserve",
-                new_callable=AsyncMock,
-                return_value=usage_log_id,
-            ),
-            patch(
-                "src.api.routes.books.repo.create_book_job",
-                new_callable=AsyncMock,
-            ) as mock_create_job,
-            patch(
-                "src.api.routes.books.BackgroundTasks.add_task",
-            ) as mock_add_task,
+            patch("src.api.routes.books.BackgroundTasks.add_task") as mock_add_task,
         ):
             resp = await client.post("/api/v1/books/generate", json=body)
 
-            assert resp.status_code == 200
-            # The body passed to add_task should have the resolved prompt string
-            task_body = mock_add_task.call_args.args[2]
-            assert task_body.image_style == mock_style.prompt_string
+        assert resp.status_code == 200
+        # The body passed to add_task should have the resolved prompt string
+        task_body = mock_add_task.call_args.args[2]
+        assert task_body.image_style == mock_style.prompt_string
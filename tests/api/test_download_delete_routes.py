@@ -4,12 +4,6 @@ import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
-import pytest
-from httpx import AsyncClient, ASGITransport
-
-from src.api.app import app
-from src.api.deps import get_db, get_current_user_id
-
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -18,6 +12,11 @@ from src.api.deps import get_db, get_current_user_id
 _TEST_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 _TEST_JOB_ID = uuid.UUID("11111111-1111-1111-1111-111111111111")
 
+_DL_BOOKLET = f"/api/v1/books/{_TEST_JOB_ID}/download/booklet"
+_DL_REVIEW = f"/api/v1/books/{_TEST_JOB_ID}/download/review"
+_DL_INVALID = f"/api/v1/books/{_TEST_JOB_ID}/download/invalid"
+_DELETE_URL = f"/api/v1/books/{_TEST_JOB_ID}"
+
 
 def _make_book_job(
     *,
@@ -37,33 +36,6 @@ def _make_book_job(
     return job
 
 
-@pytest.fixture
-async def client():
-    """Async test client with DB and auth deps overridden."""
-    mock_session = AsyncMock()
-
-    async def _override_db():
-        return mock_session
-
-    async def _override_user():
-        return _TEST_USER_ID
-
-    app.dependency_overrides[get_db] = _override_db
-    app.dependency_overrides[get_current_user_id] = _override_user
-
-    with (
-        patch("src.api.app.init_db", new_callable=AsyncMock),
-        patch("src.api.app.close_db", new_callable=AsyncMock),
-    ):
-        transport = ASGITransport(app=app)
-        async with AsyncClient(
-            transport=transport, base_url="http://test", follow_redirects=False
-        ) as c:
-            yield c
-
-    app.dependency_overrides.clear()
-
-
 # ---------------------------------------------------------------------------
 # Tests: download_book
 # ---------------------------------------------------------------------------
@@ -87,9 +59,7 @@ class TestDownloadBook:
             ),
             patch("src.api.routes.books.get_storage", return_value=mock_storage),
         ):
-            resp = await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/booklet"
-            )
+            resp = await client.get(_DL_BOOKLET)
             assert resp.status_code == 307
             assert resp.headers["location"] == "https://r2.example.com/presigned-booklet"
 
@@ -108,9 +78,7 @@ class TestDownloadBook:
             ),
             patch("src.api.routes.books.get_storage", return_value=mock_storage),
         ):
-            resp = await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/review"
-            )
+            resp = await client.get(_DL_REVIEW)
             assert resp.status_code == 307
             assert resp.headers["location"] == "https://r2.example.com/presigned-review"
 
@@ -127,9 +95,7 @@ class TestDownloadBook:
             ),
             patch("src.api.routes.books.get_storage", return_value=mock_storage),
         ):
-            await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/booklet"
-            )
+            await client.get(_DL_BOOKLET)
             call_args = mock_storage.generate_presigned_url.call_args
             r2_key = call_args.args[0]
             assert r2_key == f"pdfs/{_TEST_JOB_ID}/My_Book_booklet.pdf"
@@ -141,9 +107,7 @@ class TestDownloadBook:
             new_callable=AsyncMock,
             return_value=None,
         ):
-            resp = await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/booklet"
-            )
+            resp = await client.get(_DL_BOOKLET)
             assert resp.status_code == 404
 
     async def test_job_not_completed_returns_400(self, client):
@@ -153,9 +117,7 @@ class TestDownloadBook:
             new_callable=AsyncMock,
             return_value=job,
         ):
-            resp = await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/booklet"
-            )
+            resp = await client.get(_DL_BOOKLET)
             assert resp.status_code == 400
             assert "not ready" in resp.json()["detail"].lower()
 
@@ -167,9 +129,7 @@ class TestDownloadBook:
             new_callable=AsyncMock,
             return_value=job,
         ):
-            resp = await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/invalid"
-            )
+            resp = await client.get(_DL_INVALID)
             assert resp.status_code == 422
 
     async def test_missing_filename_returns_404(self, client):
@@ -179,9 +139,7 @@ class TestDownloadBook:
             new_callable=AsyncMock,
             return_value=job,
         ):
-            resp = await client.get(
-                f"/api/v1/books/{_TEST_JOB_ID}/download/booklet"
-            )
+            resp = await client.get(_DL_BOOKLET)
             assert resp.status_code == 404
             assert "not found" in resp.json()["detail"].lower()
 
@@ -209,7 +167,7 @@ class TestDeleteJob:
                 mock_update_job,
             ),
         ):
-            resp = await client.delete(f"/api/v1/books/{_TEST_JOB_ID}")
+            resp = await client.delete(_DELETE_URL)
             assert resp.status_code == 200
             assert "deleted" in resp.json()["message"].lower()
 
@@ -224,5 +182,5 @@ class TestDeleteJob:
             new_callable=AsyncMock,
             return_value=None,
         ):
-            resp = await client.delete(f"/api/v1/books/{_TEST_JOB_ID}")
+            resp = await client.delete(_DELETE_URL)
             assert resp.status_code == 404
@@ -3,12 +3,6 @@
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
-import pytest
-from httpx import AsyncClient, ASGITransport
-
-from src.api.app import app
-from src.api.deps import get_db, get_current_user_id
-
 
 _TEST_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
@@ -30,30 +24,6 @@ def _make_image(*, page_number=1, status="completed", error=None):
     return img
 
 
-@pytest.fixture
-async def client():
-    mock_session = AsyncMock()
-
-    async def _override_db():
-        return mock_session
-
-    async def _override_user():
-        return _TEST_USER_ID
-
-    app.dependency_overrides[get_db] = _override_db
-    app.dependency_overrides[get_current_user_id] = _override_user
-
-    with (
-        patch("src.api.app.init_db", new_callable=AsyncMock),
-        patch("src.api.app.close_db", new_callable=AsyncMock),
-    ):
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as c:
-            yield c
-
-    app.dependency_overrides.clear()
-
-
 class TestGetImageStatus:
     async def test_returns_failed_images_detail(self, client):
         job_id = uuid.uuid4()
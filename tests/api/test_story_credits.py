@@ -4,21 +4,14 @@ import uuid
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
-import pytest
-from httpx import AsyncClient, ASGITransport
-
-from src.api.app import app
-from src.api.deps import get_db, get_current_user_id
-from src.api.rate_limit import limiter
 from src.services.credit_service import InsufficientCreditsError
+from src.tasks.story_tasks import StoryAdmission
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-_TEST_USER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
-
 _VALID_BODY = {
     "prompt": "A curious kitten discovers a magical garden in the backyard",
     "age_min": 2,
@@ -31,40 +24,6 @@ _VALID_BODY = {
 _PRICING_SNAPSHOT = {"story_generation": Decimal("1.00")}
 
 
-# ---------------------------------------------------------------------------
-# Fixtures
-# ---------------------------------------------------------------------------
-
-
-@pytest.fixture
-async def client():
-    """Async test client with DB and auth deps overridden."""
-    mock_session = AsyncMock()
-
-    async def _override_db():
-        return mock_session
-
-    async def _override_user():
-        return _TEST_USER_ID
-
-    app.dependency_overrides[get_db] = _override_db
-    app.dependency_overrides[get_current_user_id] = _override_user
-
-    # Disable the rate limiter so tests don't hit 429
-    limiter.enabled = False
-
-    with (
-        patch("src.api.app.init_db", new_callable=AsyncMock),
-        patch("src.api.app.close_db", new_callable=AsyncMock),
-    ):
-        transport = ASGITransport(app=app)
-        async with AsyncClient(transport=transport, base_url="http://test") as c:
-            yield c
-
-    limiter.enabled = True
-    app.dependency_overrides.clear()
-
-
 # ---------------------------------------------------------------------------
 # Tests
 # ---------------------------------------------------------------------------
@@ -156,6 +115,46 @@ class TestStoryCredits:
             detail = resp.json()["detail"]
             assert detail == {"message": "Insufficient credits", "balance": 0.5, "required": 1.0}
 
+    async def test_create_story_returns_503_when_backlog_full(self, client):
+        """A full story backlog is refused before any credits are reserved."""
+        with (
+            patch("src.api.routes.stories.admit_story", return_value=None),
+            patch(
+                "src.api.routes.stories.CreditService.reserve",
+                new_callable=AsyncMock,
+            ) as mock_reserve,
+        ):
+            resp = await client.post("/api/v1/stories/create", json=_VALID_BODY)
+            assert resp.status_code == 503
+            mock_reserve.assert_not_called()
+
+    async def test_admission_returned_when_reserve_fails(self, client):
+        """A request that never schedules its task gives its admission back."""
+        admission = MagicMock()
+        with (
+            patch("src.api.routes.stories.admit_story", return_value=admission),
+            patch(
+                "src.api.routes.stories.CreditService.calculate_story_cost",
+                new_callable=AsyncMock,
+                return_value=Decimal("1.00"),
+            ),
+            patch(
+                "src.api.routes.stories.CreditService.get_pricing",
+                new_callable=AsyncMock,
+                return_value=_PRICING_SNAPSHOT,
+            ),
+            patch(
+                "src.api.routes.stories.CreditService.reserve",
+                new_callable=AsyncMock,
+                side_effect=InsufficientCreditsError(
+                    balance=Decimal("0.50"), required=Decimal("1.00")
+                ),
+            ),
+        ):
+            resp = await client.post("/api/v1/stories/create", json=_VALID_BODY)
+            assert resp.status_code == 402
+            admission.release.assert_called_once()
+
     async def test_create_story_passes_usage_log_id_to_task(self, client):
         """The usage_log_id returned by reserve() is forwarded to the background task."""
         usage_log_id = uuid.uuid4()
@@ -188,6 +187,7 @@ class TestStoryCredits:
 
             assert resp.status_code == 200
             mock_add_task.assert_called_once()
-            # add_task(create_story_task, str(job_id), body, user_id, usage_log_id)
+            # add_task(create_story_task, str(job_id), body, user_id, usage_log_id, admission)
             positional_args = mock_add_task.call_args.args
             assert positional_args[4] == usage_log_id
+            assert isinstance(positional_args[5], StoryAdmission)
@@ -20,6 +20,15 @@ def _clear_env_keys(monkeypatch):
     monkeypatch.delenv("DATABASE_URL", raising=False)
 
 
+# Story admission state is module-global; give every test a fresh backlog
+@pytest.fixture(autouse=True)
+def _reset_story_admission(monkeypatch):
+    from src.tasks import story_tasks
+
+    monkeypatch.setattr(story_tasks, "_story_backlog", 0)
+    monkeypatch.setattr(story_tasks, "_story_slots", None)
+
+
 @pytest.fixture
 def llm_config():
     return LLMConfig(api_key="test-key-123")
@@ -0,0 +1,373 @@
+"""Behavioral tests for CreditService against a real PostgreSQL database.
+
+The unit tests in tests/unit/test_credit_service.py only inspect the SQL
+CreditService builds; these run it. Point TEST_DATABASE_URL at a disposable
+database (e.g. postgresql://postgres@localhost/ai_book_test) — each test
+creates the credit tables and drops them afterwards. Skipped when unset.
+"""
+
+import importlib.util
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.db.models import (
+    Base,
+    CreditPricing,
+    CreditTransaction,
+    CreditUsageLog,
+    UserBalance,
+    UserCredits,
+)
+from src.services.credit_service import CreditService, InsufficientCreditsError
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set"
+)
+
+_TABLES = [
+    CreditTransaction.__table__,
+    UserCredits.__table__,
+    UserBalance.__table__,
+    CreditPricing.__table__,
+    CreditUsageLog.__table__,
+]
+
+_USER_BALANCES_MIGRATION = (
+    Path(__file__).resolve().parents[2]
+    / "alembic" / "versions" / "p6q7r8s9t0u1_create_user_balances.py"
+)
+
+_T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+async def engine():
+    url = TEST_DATABASE_URL
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=_TABLES)
+        await conn.run_sync(Base.metadata.create_all, tables=_TABLES)
+    yield engine
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP FUNCTION IF EXISTS sync_user_balance() CASCADE"))
+        await conn.run_sync(Base.metadata.drop_all, tables=_TABLES)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+
+
+@pytest.fixture
+def user_id():
+    return uuid.uuid4()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+async def _add_batches(session, user_id, *amounts, is_refunded=False) -> list[uuid.UUID]:
+    """Insert one batch per amount, oldest first, in a single statement."""
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "original_amount": Decimal(amount),
+            "remaining_amount": Decimal(amount),
+            "source": "purchase",
+            "is_refunded": is_refunded,
+            "created_at": _T0 + timedelta(minutes=i),
+            "updated_at": _T0,
+        }
+        for i, amount in enumerate(amounts)
+    ]
+    await session.execute(insert(UserCredits), rows)
+    await session.commit()
+    return [row["id"] for row in rows]
+
+
+async def _remaining(session, batch_ids) -> list[Decimal]:
+    result = await session.execute(
+        select(UserCredits.id, UserCredits.remaining_amount).where(UserCredits.id.in_(batch_ids))
+    )
+    by_id = dict(result.all())
+    return [by_id[batch_id] for batch_id in batch_ids]
+
+
+async def _usage_log(session, usage_log_id) -> CreditUsageLog:
+    session.expire_all()
+    return (
+        await session.execute(select(CreditUsageLog).where(CreditUsageLog.id == usage_log_id))
+    ).scalar_one()
+
+
+async def _reserve(session, user_id, amount, metadata=None):
+    return await CreditService(session).reserve(
+        user_id=user_id,
+        amount=Decimal(amount),
+        job_id=uuid.uuid4(),
+        job_type="book",
+        description="Book generation",
+        metadata=metadata or {},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+
+class TestReserve:
+    async def test_fifo_split_across_batches(self, session, user_id):
+        batches = await _add_batches(session, user_id, "1.00", "2.50", "5.00")
+
+        usage_log_id = await _reserve(session, user_id, "3.25", {"title": "T", "secret": "x"})
+
+        assert await _remaining(session, batches) == [Decimal("0.00"), Decimal("0.25"), Decimal("5.00")]
+        log = await _usage_log(session, usage_log_id)
+        assert log.status == "reserved"
+        assert log.credits_used == Decimal("3.25")
+        assert log.reserved_at is not None
+        assert log.extra_metadata == {
+            "title": "T",
+            "batches_consumed": [[batches[0].hex, 100], [batches[1].hex, 225]],
+        }
+
+    async def test_exact_total_drains_every_batch(self, session, user_id):
+        batches = await _add_batches(session, user_id, "0.10", "0.05")
+
+        await _reserve(session, user_id, "0.15")
+
+        assert await _remaining(session, batches) == [Decimal("0.00"), Decimal("0.00")]
+
+    async def test_minor_unit_arithmetic(self, session, user_id):
+        batches = await _add_batches(session, user_id, "0.10", "0.05", "0.01")
+
+        usage_log_id = await _reserve(session, user_id, "0.13")
+
+        assert await _remaining(session, batches) == [Decimal("0.00"), Decimal("0.02"), Decimal("0.01")]
+        log = await _usage_log(session, usage_log_id)
+        assert log.extra_metadata["batches_consumed"] == [[batches[0].hex, 10], [batches[1].hex, 3]]
+
+    async def test_skips_refunded_and_empty_batches(self, session, user_id):
+        refunded = await _add_batches(session, user_id, "5.00", is_refunded=True)
+        batches = await _add_batches(session, user_id, "0.00", "2.00")
+
+        await _reserve(session, user_id, "1.50")
+
+        assert await _remaining(session, refunded) == [Decimal("5.00")]
+        assert await _remaining(session, batches) == [Decimal("0.00"), Decimal("0.50")]
+
+    async def test_insufficient_credits_changes_nothing(self, session, user_id):
+        batches = await _add_batches(session, user_id, "1.00", "0.50")
+
+        with pytest.raises(InsufficientCreditsError) as exc_info:
+            await _reserve(session, user_id, "2.00")
+        await session.rollback()
+
+        assert exc_info.value.balance == Decimal("1.50")
+        assert exc_info.value.required == Decimal("2.00")
+        assert await _remaining(session, batches) == [Decimal("1.00"), Decimal("0.50")]
+        logs = (await session.execute(select(CreditUsageLog))).scalars().all()
+        assert logs == []
+
+    async def test_no_batches_reports_zero_balance(self, session, user_id):
+        with pytest.raises(InsufficientCreditsError) as exc_info:
+            await _reserve(session, user_id, "1.00")
+
+        assert exc_info.value.balance == Decimal("0")
+
+    async def test_other_users_batches_untouched(self, session, user_id):
+        other = await _add_batches(session, uuid.uuid4(), "10.00")
+        await _add_batches(session, user_id, "1.00")
+
+        with pytest.raises(InsufficientCreditsError):
+            await _reserve(session, user_id, "2.00")
+        await session.rollback()
+
+        assert await _remaining(session, other) == [Decimal("10.00")]
+
+
+class TestConfirm:
+    async def test_confirms_reserved_log_once(self, session, user_id):
+        batches = await _add_batches(session, user_id, "2.00")
+        usage_log_id = await _reserve(session, user_id, "1.00")
+        service = CreditService(session)
+
+        await service.confirm(usage_log_id, user_id)
+        await service.release(usage_log_id, user_id)
+
+        assert (await _usage_log(session, usage_log_id)).status == "confirmed"
+        assert await _remaining(session, batches) == [Decimal("1.00")]
+
+    async def test_wrong_user_is_noop(self, session, user_id):
+        await _add_batches(session, user_id, "2.00")
+        usage_log_id = await _reserve(session, user_id, "1.00")
+
+        await CreditService(session).confirm(usage_log_id, uuid.uuid4())
+
+        assert (await _usage_log(session, usage_log_id)).status == "reserved"
+
+
+class TestRelease:
+    async def test_restores_compact_entries(self, session, user_id):
+        batches = await _add_batches(session, user_id, "1.00", "2.50")
+        usage_log_id = await _reserve(session, user_id, "1.75")
+
+        await CreditService(session).release(usage_log_id, user_id)
+
+        assert (await _usage_log(session, usage_log_id)).status == "released"
+        assert await _remaining(session, batches) == [Decimal("1.00"), Decimal("2.50")]
+
+    async def test_second_release_does_not_refund_twice(self, session, user_id):
+        batches = await _add_batches(session, user_id, "3.00")
+        usage_log_id = await _reserve(session, user_id, "2.00")
+        service = CreditService(session)
+
+        await service.release(usage_log_id, user_id)
+        await service.release(usage_log_id, user_id)
+
+        assert await _remaining(session, batches) == [Decimal("3.00")]
+
+    async def test_restores_legacy_entries(self, session, user_id):
+        """Logs reserved before the compact format carry {batch_id, amount} objects."""
+        batches = await _add_batches(session, user_id, "2.00", "1.00")
+        await session.execute(
+            UserCredits.__table__.update()
+            .where(UserCredits.id.in_(batches))
+            .values(remaining_amount=Decimal("0.50"))
+        )
+        usage_log_id = uuid.uuid4()
+        session.add(CreditUsageLog(
+            id=usage_log_id, user_id=user_id, job_id=uuid.uuid4(), job_type="story",
+            credits_used=Decimal("2.00"), status="reserved", reserved_at=_T0,
+            extra_metadata={"batches_consumed": [
+                {"batch_id": str(batches[0]), "amount": "1.50"},
+                {"batch_id": str(batches[1]), "amount": "0.50"},
+            ]},
+        ))
+        await session.commit()
+
+        await CreditService(session).release(usage_log_id, user_id)
+
+        assert await _remaining(session, batches) == [Decimal("2.00"), Decimal("1.00")]
+
+    async def test_stale_reservation_cleanup_refunds(self, session, user_id):
+        batches = await _add_batches(session, user_id, "2.00")
+        usage_log_id = await _reserve(session, user_id, "2.00")
+        await session.execute(
+            CreditUsageLog.__table__.update()
+            .where(CreditUsageLog.id == usage_log_id)
+            .values(reserved_at=_T0)
+        )
+        await session.commit()
+
+        assert await CreditService(session).cleanup_stale_reservations() == 1
+
+        assert (await _usage_log(session, usage_log_id)).status == "released"
+        assert await _remaining(session, batches) == [Decimal("2.00")]
+
+
+class TestUserBalanceTrigger:
+    """user_balances as maintained by the p6q7r8s9t0u1 migration's trigger."""
+
+    @pytest.fixture
+    async def migrate(self, engine):
+        """Return a coroutine that runs the user_balances migration's upgrade()."""
+        from alembic.operations import Operations
+        from alembic.runtime.migration import MigrationContext
+
+        spec = importlib.util.spec_from_file_location("user_balances_migration", _USER_BALANCES_MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        def _upgrade(sync_conn):
+            with Operations.context(MigrationContext.configure(sync_conn)):
+                migration.upgrade()
+
+        async def _migrate():
+            async with engine.begin() as conn:
+                # Supabase's auth.uid(), referenced by the RLS policy
+                await conn.execute(text("CREATE SCHEMA IF NOT EXISTS auth"))
+                await conn.execute(text(
+                    "CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid "
+                    "LANGUAGE sql STABLE AS 'SELECT NULL::uuid'"
+                ))
+                await conn.run_sync(UserBalance.__table__.drop)
+                await conn.run_sync(_upgrade)
+
+        return _migrate
+
+    async def _stored_balance(self, session, user_id):
+        return (
+            await session.execute(select(UserBalance.balance).where(UserBalance.user_id == user_id))
+        ).scalar_one_or_none()
+
+    async def test_migration_leaves_existing_ledgers_to_sum_fallback(self, session, migrate, user_id):
+        await _add_batches(session, user_id, "1.00", "2.50")
+
+        await migrate()
+
+        assert await self._stored_balance(session, user_id) is None
+        assert await CreditService(session).get_balance(user_id) == Decimal("3.50")
+
+    async def test_rebuild_balance_backfills_existing_ledgers(self, session, migrate, user_id):
+        await _add_batches(session, user_id, "1.00", "2.50")
+        await _add_batches(session, user_id, "9.00", is_refunded=True)
+        await migrate()
+
+        assert await CreditService(session).rebuild_balance(user_id) == Decimal("3.50")
+        assert await self._stored_balance(session, user_id) == Decimal("3.50")
+
+    async def test_rebuild_balance_corrects_delta_only_row(self, session, migrate, user_id):
+        await _add_batches(session, user_id, "1.00", "2.50")
+        await migrate()
+        # A write before the backfill leaves a row holding only that delta
+        await _add_batches(session, user_id, "0.75")
+        assert await self._stored_balance(session, user_id) == Decimal("0.75")
+
+        service = CreditService(session)
+        assert await service.rebuild_balance(user_id) == Decimal("4.25")
+        assert await service.rebuild_balance(user_id) == Decimal("4.25")
+        assert await service.get_balance(user_id) == Decimal("4.25")
+
+    async def test_multi_row_write_without_balance_row_counts_once(self, session, migrate, user_id):
+        await migrate()
+
+        await _add_batches(session, user_id, "1.00", "2.50")
+        assert await self._stored_balance(session, user_id) == Decimal("3.50")
+
+        await _reserve(session, user_id, "3.25")
+        assert await CreditService(session).get_balance(user_id) == Decimal("0.25")
+
+    async def test_release_restores_balance(self, session, migrate, user_id):
+        await _add_batches(session, user_id, "1.00", "2.50")
+        await migrate()
+        await CreditService(session).rebuild_balance(user_id)
+
+        usage_log_id = await _reserve(session, user_id, "3.00")
+        await CreditService(session).release(usage_log_id, user_id)
+
+        assert await CreditService(session).get_balance(user_id) == Decimal("3.50")
@@ -189,6 +189,38 @@ class TestBookImageGenerator:
         h2 = BookImageGenerator.compute_prompt_hash("prompt B")
         assert h1 != h2
 
+    def test_prompt_hash_fits_column(self):
+        """BLAKE2b-128 keeps the 32-char width of generated_images.prompt_hash."""
+        h = BookImageGenerator.compute_prompt_hash("a prompt")
+        assert len(h) == 32
+        assert h != BookImageGenerator.compute_legacy_prompt_hash("a prompt")
+
+    async def test_check_cache_looks_up_legacy_hash_in_same_call(self):
+        """The BLAKE2b hash and the MD5 hash older rows carry are looked up together."""
+        config = ImageConfig(api_key="test", use_cache=True)
+        mock_storage = AsyncMock()
+        mock_storage.download_bytes = AsyncMock(return_value=MINIMAL_PNG)
+
+        cached_row = MagicMock()
+        cached_row.r2_key = "images/old-job/page_1.png"
+        legacy_hash = BookImageGenerator.compute_legacy_prompt_hash("test prompt")
+        looked_up = []
+
+        async def cache_fn(*prompt_hashes):
+            looked_up.append(prompt_hashes)
+            return cached_row if legacy_hash in prompt_hashes else None
+
+        gen = BookImageGenerator(
+            config,
+            storage=mock_storage,
+            book_job_id="new-job",
+            cache_check_fn=cache_fn,
+        )
+        result = await gen._check_cache("test prompt", page_number=1)
+        assert result is not None
+        assert result.image_path == "images/old-job/page_1.png"
+        assert looked_up == [(BookImageGenerator.compute_prompt_hash("test prompt"), legacy_hash)]
+
     async def test_check_cache_hit(self):
         """Cache hit: cache_check_fn returns a row, storage downloads and reuses existing key."""
         config = ImageConfig(api_key="test", use_cache=True)
@@ -200,7 +232,7 @@ class TestBookImageGenerator:
         cached_row = MagicMock()
         cached_row.r2_key = "images/old-job/page_1.png"
 
-        async def cache_fn(prompt_hash):
+        async def cache_fn(*prompt_hashes):
             return cached_row
 
         gen = BookImageGenerator(
@@ -222,7 +254,7 @@ class TestBookImageGenerator:
         config = ImageConfig(api_key="test", use_cache=True)
         mock_storage = AsyncMock()
 
-        async def cache_fn(prompt_hash):
+        async def cache_fn(*prompt_hashes):
             return None
 
         gen = BookImageGenerator(
@@ -267,3 +299,21 @@ class TestBookImageGenerator:
         assert 3 not in results
         assert 1 in results
         assert 2 in results
+
+    async def test_generate_all_images_carries_prompt_hash(self):
+        config = ImageConfig(api_key="test", use_cache=False)
+        gen = BookImageGenerator(config)
+
+        async def _generate(prompt):
+            return GeneratedImage(success=True, image_data=MINIMAL_PNG, prompt_used=prompt)
+
+        gen.generator = AsyncMock()
+        gen.generator.generate = AsyncMock(side_effect=_generate)
+
+        pages = [
+            {"page_number": 1, "content": "Cover", "page_type": "cover"},
+            {"page_number": 2, "content": "Text", "page_type": "content"},
+        ]
+        results = await gen.generate_all_images(pages)
+        for result in results.values():
+            assert result.prompt_hash == BookImageGenerator.compute_prompt_hash(result.prompt_used)
@@ -1,11 +1,13 @@
 """Tests for credit confirm/release flows in generate_book_task."""
 
+import asyncio
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from src.api.schemas import BookGenerateRequest
+from src.tasks._common import ProgressWriter
 from src.tasks.book_tasks import generate_book_task
 
 
@@ -49,7 +51,7 @@ def _mock_session_factory():
 
 
 def _mock_storage():
-    """Create a mock storage with upload_file returning 1024."""
+    """Create a mock storage that accepts PDF file uploads."""
     storage = AsyncMock()
     storage.upload_file = AsyncMock(return_value=1024)
     return storage
@@ -73,14 +75,14 @@ class TestBookTaskCredits:
             patch("src.tasks.book_tasks.get_session_factory", return_value=factory),
             patch("src.tasks.book_tasks.get_storage", return_value=storage),
             patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.repo.create_generated_pdf", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.generate_both_pdfs") as mock_gen_pdfs,
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
             patch("src.tasks.book_tasks.CreditService.confirm", new_callable=AsyncMock) as mock_confirm,
             patch("src.tasks.book_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
         ):
-            # generate_both_pdfs is called inside run_in_executor (sync)
-            mock_gen_pdfs.return_value = None
-
+            # the PDF renderers run on the default executor instead of worker processes
             await generate_book_task(
                 job_id=_TEST_JOB_ID,
                 request=_REQUEST,
@@ -108,13 +110,13 @@ class TestBookTaskCredits:
             patch("src.tasks.book_tasks.get_session_factory", return_value=factory),
             patch("src.tasks.book_tasks.get_storage", return_value=storage),
             patch("src.tasks.book_tasks.repo.update_book_job", mock_update),
-            patch("src.tasks.book_tasks.repo.create_generated_pdf", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.generate_both_pdfs") as mock_gen_pdfs,
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
             patch("src.tasks.book_tasks.CreditService.confirm", new_callable=AsyncMock) as mock_confirm,
             patch("src.tasks.book_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
         ):
-            mock_gen_pdfs.return_value = None
-
             await generate_book_task(
                 job_id=_TEST_JOB_ID,
                 request=_REQUEST,
@@ -125,6 +127,75 @@ class TestBookTaskCredits:
             mock_release.assert_called_once_with(_TEST_USAGE_LOG_ID, _TEST_USER_ID)
             mock_confirm.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_no_confirm_when_pdf_rows_write_fails(self):
+        """A failed completion write must release credits, never confirm them."""
+        factory, _session = _mock_session_factory()
+        storage = _mock_storage()
+
+        with (
+            patch("src.tasks.book_tasks.get_session_factory", return_value=factory),
+            patch("src.tasks.book_tasks.get_storage", return_value=storage),
+            patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
+            patch(
+                "src.tasks.book_tasks.repo.bulk_create_generated_pdfs",
+                new_callable=AsyncMock,
+                side_effect=RuntimeError("insert failed"),
+            ),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
+            patch("src.tasks.book_tasks.CreditService.confirm", new_callable=AsyncMock) as mock_confirm,
+            patch("src.tasks.book_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
+        ):
+            await generate_book_task(
+                job_id=_TEST_JOB_ID,
+                request=_REQUEST,
+                user_id=_TEST_USER_ID,
+                usage_log_id=_TEST_USAGE_LOG_ID,
+            )
+
+            mock_confirm.assert_not_called()
+            mock_release.assert_called_once_with(_TEST_USAGE_LOG_ID, _TEST_USER_ID)
+
+    @pytest.mark.asyncio
+    async def test_failed_visual_analysis_retrieved_when_text_processing_fails(self, caplog):
+        """An analysis task that failed before text processing raised is not left unretrieved."""
+        factory, _session = _mock_session_factory()
+        llm_config = MagicMock()
+        llm_config.validate.return_value = True
+
+        def _build_book_content(request, job_id):
+            raise RuntimeError("text processing failed")
+
+        async def _analyze(**kwargs):
+            raise ValueError("analysis failed")
+
+        async def _enter_after_analysis(writer):
+            # Let the analysis task run (and fail) before text processing starts
+            await asyncio.sleep(0)
+            return writer
+
+        with (
+            patch("src.tasks.book_tasks.get_session_factory", return_value=factory),
+            patch("src.tasks.book_tasks.get_storage", return_value=_mock_storage()),
+            patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks.LLMConfig", return_value=llm_config),
+            patch("src.tasks.book_tasks.analyze_story_for_visuals", side_effect=_analyze),
+            patch("src.tasks.book_tasks._build_book_content", side_effect=_build_book_content),
+            patch.object(ProgressWriter, "__aenter__", _enter_after_analysis),
+            patch("src.tasks.book_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
+        ):
+            await generate_book_task(
+                job_id=_TEST_JOB_ID,
+                request=_REQUEST.model_copy(update={"generate_images": True}),
+                user_id=_TEST_USER_ID,
+                usage_log_id=_TEST_USAGE_LOG_ID,
+            )
+
+        mock_release.assert_called_once_with(_TEST_USAGE_LOG_ID, _TEST_USER_ID)
+        assert "Abandoned background task had failed: ValueError('analysis failed')" in caplog.text
+
     @pytest.mark.asyncio
     async def test_no_credit_ops_when_usage_log_none(self):
         """When usage_log_id is None, neither confirm nor release should be called."""
@@ -135,13 +206,13 @@ class TestBookTaskCredits:
             patch("src.tasks.book_tasks.get_session_factory", return_value=factory),
             patch("src.tasks.book_tasks.get_storage", return_value=storage),
             patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.repo.create_generated_pdf", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.generate_both_pdfs") as mock_gen_pdfs,
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
             patch("src.tasks.book_tasks.CreditService.confirm", new_callable=AsyncMock) as mock_confirm,
             patch("src.tasks.book_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
         ):
-            mock_gen_pdfs.return_value = None
-
             await generate_book_task(
                 job_id=_TEST_JOB_ID,
                 request=_REQUEST,
@@ -0,0 +1,230 @@
+"""Tests for book_tasks helpers: cache lookups, bounded gathers, session and task scoping, PDF inputs."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.tasks.book_tasks import (
+    _build_pdf_filenames,
+    _cancel_on_exit,
+    _in_own_session,
+    _make_cache_check_fn,
+    _write_page_images,
+)
+
+
+def _mock_session_factory():
+    session = AsyncMock()
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=session)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    factory = MagicMock()
+    factory.return_value = ctx
+    return factory, session
+
+
+class TestCacheCheckFn:
+    @pytest.mark.asyncio
+    async def test_repeated_hash_queries_once(self):
+        """Concurrent and later lookups of one hash share a single DB query."""
+        factory, session = _mock_session_factory()
+        cached_row = MagicMock()
+        with patch(
+            "src.tasks.book_tasks.repo.find_cached_image_by_hash",
+            new_callable=AsyncMock, return_value=cached_row,
+        ) as mock_find:
+            cache_check_fn = _make_cache_check_fn(factory)
+            results = await asyncio.gather(
+                cache_check_fn("abc"), cache_check_fn("abc"), cache_check_fn("abc"),
+            )
+            assert await cache_check_fn("abc") is cached_row
+
+        assert results == [cached_row] * 3
+        mock_find.assert_awaited_once_with(session, "abc")
+
+    @pytest.mark.asyncio
+    async def test_current_and_legacy_hash_share_one_query(self):
+        factory, session = _mock_session_factory()
+        with patch(
+            "src.tasks.book_tasks.repo.find_cached_image_by_hash",
+            new_callable=AsyncMock, return_value=None,
+        ) as mock_find:
+            assert await _make_cache_check_fn(factory)("new", "legacy") is None
+
+        mock_find.assert_awaited_once_with(session, "new", "legacy")
+
+    @pytest.mark.asyncio
+    async def test_distinct_hashes_query_separately(self):
+        factory, _session = _mock_session_factory()
+        with patch(
+            "src.tasks.book_tasks.repo.find_cached_image_by_hash",
+            new_callable=AsyncMock, return_value=None,
+        ) as mock_find:
+            cache_check_fn = _make_cache_check_fn(factory)
+            assert await cache_check_fn("abc") is None
+            assert await cache_check_fn("def") is None
+
+        assert mock_find.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_memo_is_per_job(self):
+        factory, _session = _mock_session_factory()
+        with patch(
+            "src.tasks.book_tasks.repo.find_cached_image_by_hash",
+            new_callable=AsyncMock, return_value=None,
+        ) as mock_find:
+            await _make_cache_check_fn(factory)("abc")
+            await _make_cache_check_fn(factory)("abc")
+
+        assert mock_find.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_caps_open_lookup_sessions(self):
+        factory, _session = _mock_session_factory()
+        in_flight = peak = 0
+
+        async def slow_find(session, prompt_hash):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        with (
+            patch("src.tasks.book_tasks.repo.find_cached_image_by_hash", side_effect=slow_find),
+            patch("src.tasks.book_tasks.CACHE_CHECK_CONCURRENCY", 2),
+        ):
+            cache_check_fn = _make_cache_check_fn(factory)
+            await asyncio.gather(*(cache_check_fn(f"h{i}") for i in range(6)))
+
+        assert peak == 2
+        assert factory.call_count == 6
+
+
+class TestGatherBounded:
+    @pytest.mark.asyncio
+    async def test_preserves_order_and_caps_concurrency(self):
+        from src.tasks.book_tasks import _gather_bounded
+
+        in_flight = 0
+        peak = 0
+
+        async def job(n):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return n
+
+        results = await _gather_bounded([job(n) for n in range(10)], limit=3)
+        assert results == list(range(10))
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_cancels_siblings_and_raises_original(self):
+        from src.tasks.book_tasks import _gather_bounded
+
+        cancelled = []
+
+        async def slow(n):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(n)
+                raise
+
+        async def boom():
+            raise ValueError("upload failed")
+
+        with pytest.raises(ValueError, match="upload failed"):
+            await _gather_bounded([slow(1), boom(), slow(2)], limit=3)
+        assert sorted(cancelled) == [1, 2]
+
+
+class TestInOwnSession:
+    @pytest.mark.asyncio
+    async def test_each_call_opens_its_own_session(self):
+        """Gathered writes must not share one AsyncSession."""
+        sessions = [AsyncMock(), AsyncMock()]
+        factory = MagicMock()
+        factory.side_effect = [
+            MagicMock(
+                __aenter__=AsyncMock(return_value=s),
+                __aexit__=AsyncMock(return_value=False),
+            )
+            for s in sessions
+        ]
+        seen = []
+
+        async def _write(session):
+            seen.append(session)
+            await asyncio.sleep(0)
+
+        await asyncio.gather(
+            _in_own_session(factory, _write), _in_own_session(factory, _write),
+        )
+
+        assert seen == sessions
+
+
+class TestCancelOnExit:
+    @pytest.mark.asyncio
+    async def test_cancels_unawaited_task_on_error(self):
+        task = asyncio.create_task(asyncio.sleep(60))
+        with pytest.raises(RuntimeError):
+            async with _cancel_on_exit(task):
+                raise RuntimeError("text processing failed")
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_leaves_awaited_task_alone(self):
+        task = asyncio.create_task(asyncio.sleep(0, result="ctx"))
+        async with _cancel_on_exit(task):
+            assert await task == "ctx"
+        assert not task.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_retrieves_error_of_failed_unawaited_task(self, caplog):
+        async def _fail():
+            raise ValueError("analysis failed")
+
+        task = asyncio.create_task(_fail())
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            async with _cancel_on_exit(task):
+                raise RuntimeError("text processing failed")
+
+        assert "analysis failed" in caplog.text
+        assert not task._log_traceback
+
+    @pytest.mark.asyncio
+    async def test_accepts_none(self):
+        async with _cancel_on_exit(None):
+            pass
+
+
+class TestBuildPdfFilenames:
+    def test_sanitizes_title(self):
+        booklet, review = _build_pdf_filenames(" The Bunny's Day/Night! ")
+        assert booklet.startswith("The_Bunny_s_Day_Night_")
+        assert booklet.endswith("_booklet.pdf")
+        assert review == booklet.replace("_booklet.pdf", "_review.pdf")
+
+    def test_keeps_non_latin_letters(self):
+        booklet, _ = _build_pdf_filenames("Зайка-хвастунишка")
+        assert booklet.startswith("Зайка-хвастунишка_")
+
+
+class TestWritePageImages:
+    def test_writes_one_file_per_page(self, tmp_path):
+        paths = _write_page_images(str(tmp_path), {1: b"one", 3: b"three"})
+        assert set(paths) == {1, 3}
+        assert open(paths[3], "rb").read() == b"three"
+
+    def test_passes_paths_through(self, tmp_path):
+        existing = str(tmp_path / "downloaded.png")
+        paths = _write_page_images(str(tmp_path / "unused"), {2: existing})
+        assert paths == {2: existing}
@@ -3,7 +3,7 @@
 import uuid
 from decimal import Decimal
 
-from src.db.models import UserCredits, CreditPricing, CreditUsageLog
+from src.db.models import UserCredits, UserBalance, CreditPricing, CreditUsageLog
 
 
 class TestUserCreditsModel:
@@ -47,6 +47,19 @@ class TestUserCreditsModel:
         assert col.default.arg is False
 
 
+class TestUserBalanceModel:
+    def test_create_balance_row(self):
+        user_id = uuid.uuid4()
+        ub = UserBalance(user_id=user_id, balance=Decimal("12.50"))
+        assert ub.user_id == user_id
+        assert ub.balance == Decimal("12.50")
+
+    def test_user_id_is_primary_key(self):
+        """One balance row per user, looked up by primary key."""
+        pk_cols = [c.name for c in UserBalance.__table__.primary_key.columns]
+        assert pk_cols == ["user_id"]
+
+
 class TestCreditPricingModel:
     def test_create_pricing(self):
         pricing = CreditPricing(
@@ -112,6 +112,16 @@ class TestImageCache:
         reader2 = cache.get_image_reader(1)
         assert reader1 is reader2  # Same object returned
 
+    def test_image_file_path(self, tmp_path):
+        import base64
+        png_b64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
+        image_path = tmp_path / "page_1.png"
+        image_path.write_bytes(base64.b64decode(png_b64))
+        cache = ImageCache({1: str(image_path)})
+        reader = cache.get_image_reader(1)
+        assert reader is not None
+        assert reader.getSize() == (1, 1)
+
 
 # =============================================================================
 # get_print_instructions
@@ -135,3 +145,43 @@ class TestGetPrintInstructions:
     def test_unknown_language_falls_back_to_english(self):
         instructions = get_print_instructions("Japanese")
         assert "PRINTING INSTRUCTIONS" in instructions
+
+
+# =============================================================================
+# Rendering to files
+# =============================================================================
+
+
+class TestRenderPdfs:
+    def test_generate_both_pdfs(self, sample_book_content, tmp_path):
+        from src.core.pdf_generator import generate_both_pdfs
+
+        booklet, review = tmp_path / "booklet.pdf", tmp_path / "review.pdf"
+        generate_both_pdfs(sample_book_content, str(booklet), str(review))
+
+        assert booklet.read_bytes().startswith(b"%PDF")
+        assert review.read_bytes().startswith(b"%PDF")
+
+    def test_render_arguments_are_picklable(self, sample_book_content):
+        import pickle
+
+        # Arguments must survive the trip to a worker process
+        pickle.dumps(sample_book_content)
+
+    def test_render_booklet_and_review_separately(self, sample_book_content, tmp_path):
+        from src.core.pdf_generator import render_booklet_pdf, render_review_pdf
+
+        booklet, review = tmp_path / "booklet.pdf", tmp_path / "review.pdf"
+        render_booklet_pdf(sample_book_content, str(booklet))
+        render_review_pdf(sample_book_content, str(review))
+
+        assert booklet.read_bytes().startswith(b"%PDF")
+        assert review.read_bytes().startswith(b"%PDF")
+
+    def test_render_to_file_path(self, sample_book_content, tmp_path):
+        from src.core.pdf_generator import render_booklet_pdf
+
+        path = tmp_path / "booklet.pdf"
+        render_booklet_pdf(sample_book_content, str(path))
+
+        assert path.read_bytes().startswith(b"%PDF")
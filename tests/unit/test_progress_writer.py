@@ -0,0 +1,98 @@
+"""Tests for the background ProgressWriter used by task progress pings."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.tasks._common import ProgressWriter
+
+
+_TEST_JOB_ID = uuid.UUID("00000000-0000-0000-0000-000000000099")
+
+
+def _mock_session_factory():
+    session = AsyncMock()
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=session)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    factory = MagicMock()
+    factory.return_value = ctx
+    return factory, session
+
+
+def _written(update_fn) -> list[str]:
+    return [c.kwargs["progress"] for c in update_fn.call_args_list]
+
+
+class TestProgressWriter:
+    @pytest.mark.asyncio
+    async def test_post_does_not_write_inline(self):
+        factory, _session = _mock_session_factory()
+        update_fn = AsyncMock()
+        async with ProgressWriter(factory, update_fn, _TEST_JOB_ID) as progress:
+            progress.post("Step 1")
+            update_fn.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_coalesces_to_latest_message(self):
+        factory, session = _mock_session_factory()
+        update_fn = AsyncMock()
+        async with ProgressWriter(factory, update_fn, _TEST_JOB_ID, interval=60) as progress:
+            progress.post("Step 1")
+            await asyncio.sleep(0)  # worker writes Step 1, then waits out the interval
+            progress.post("Step 2")
+            progress.post("Step 3")
+            await progress.flush()
+
+        assert _written(update_fn) == ["Step 1", "Step 3"]
+        update_fn.assert_called_with(session, _TEST_JOB_ID, progress="Step 3")
+
+    @pytest.mark.asyncio
+    async def test_exit_drops_unwritten_message(self):
+        """On failure paths the error handler owns the final progress text."""
+        factory, _session = _mock_session_factory()
+        update_fn = AsyncMock()
+        with pytest.raises(RuntimeError):
+            async with ProgressWriter(factory, update_fn, _TEST_JOB_ID) as progress:
+                progress.post("Generating PDF files...")
+                raise RuntimeError("boom")
+
+        await asyncio.sleep(0)
+        update_fn.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_write_failure_is_logged_not_raised(self):
+        factory, _session = _mock_session_factory()
+        update_fn = AsyncMock(side_effect=RuntimeError("DB connection lost"))
+        async with ProgressWriter(factory, update_fn, _TEST_JOB_ID) as progress:
+            progress.post("Step 1")
+            await progress.flush()
+
+        update_fn.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_flush_waits_for_in_flight_write(self):
+        """flush() lets a write already in progress finish instead of cancelling it."""
+        factory, _session = _mock_session_factory()
+        write_started = asyncio.Event()
+        finish_write = asyncio.Event()
+        completed = []
+
+        async def slow_update(session, job_id, progress):
+            write_started.set()
+            await finish_write.wait()
+            completed.append(progress)
+
+        async with ProgressWriter(factory, slow_update, _TEST_JOB_ID, interval=60) as progress:
+            progress.post("Step 1")
+            await write_started.wait()
+            progress.post("Step 2")
+            flush = asyncio.create_task(progress.flush())
+            await asyncio.sleep(0)
+            assert not flush.done()
+            finish_write.set()
+            await flush
+
+        assert completed == ["Step 1", "Step 2"]
@@ -41,7 +41,7 @@ class TestRegenerationUsesPerImageModel:
         factory, session = _mock_session_factory()
         storage = AsyncMock()
         storage.upload_bytes = AsyncMock()
-        storage.download_bytes = AsyncMock(return_value=b"fake-image")
+        storage.download_to_file = AsyncMock(return_value=len(b"fake-image"))
         storage.delete = AsyncMock()
         storage.upload_file = AsyncMock(return_value=1024)
 
@@ -53,6 +53,7 @@ class TestRegenerationUsesPerImageModel:
             "generate_images": True,
             "image_model": "openai/gpt-4o",
         }
+        mock_job.book_content_json = None
 
         # Success result from generator
         gen_result = MagicMock()
@@ -77,16 +78,18 @@ class TestRegenerationUsesPerImageModel:
             patch("src.tasks.book_tasks.repo.reset_image_for_retry", new_callable=AsyncMock),
             patch("src.tasks.book_tasks.repo.update_generated_image", new_callable=AsyncMock),
             patch("src.tasks.book_tasks.repo.get_book_job", new_callable=AsyncMock, return_value=mock_job),
-            patch("src.tasks.book_tasks.repo.get_images_for_book", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.get_completed_image_keys", new_callable=AsyncMock, return_value=[]),
             patch("src.tasks.book_tasks.repo.delete_pdfs_for_book", new_callable=AsyncMock, return_value=[]),
-            patch("src.tasks.book_tasks.repo.create_generated_pdf", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.generate_both_pdfs"),
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
             patch(
-                "src.core.image_generator.ImageConfig",
+                "src.tasks.book_tasks.ImageConfig",
                 side_effect=capture_image_config,
             ),
             patch(
-                "src.core.image_generator.OpenRouterImageGenerator",
+                "src.tasks.book_tasks.OpenRouterImageGenerator",
                 return_value=mock_generator,
             ),
         ):
@@ -105,7 +108,7 @@ class TestRegenerationUsesPerImageModel:
         factory, session = _mock_session_factory()
         storage = AsyncMock()
         storage.upload_bytes = AsyncMock()
-        storage.download_bytes = AsyncMock(return_value=b"fake-image")
+        storage.download_to_file = AsyncMock(return_value=len(b"fake-image"))
         storage.delete = AsyncMock()
         storage.upload_file = AsyncMock(return_value=1024)
 
@@ -115,6 +118,7 @@ class TestRegenerationUsesPerImageModel:
             "title": "Test",
             "generate_images": True,
         }
+        mock_job.book_content_json = None
 
         gen_result = MagicMock()
         gen_result.success = True
@@ -137,16 +141,18 @@ class TestRegenerationUsesPerImageModel:
             patch("src.tasks.book_tasks.repo.reset_image_for_retry", new_callable=AsyncMock),
             patch("src.tasks.book_tasks.repo.update_generated_image", new_callable=AsyncMock),
             patch("src.tasks.book_tasks.repo.get_book_job", new_callable=AsyncMock, return_value=mock_job),
-            patch("src.tasks.book_tasks.repo.get_images_for_book", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.get_completed_image_keys", new_callable=AsyncMock, return_value=[]),
             patch("src.tasks.book_tasks.repo.delete_pdfs_for_book", new_callable=AsyncMock, return_value=[]),
-            patch("src.tasks.book_tasks.repo.create_generated_pdf", new_callable=AsyncMock),
-            patch("src.tasks.book_tasks.generate_both_pdfs"),
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
             patch(
-                "src.core.image_generator.ImageConfig",
+                "src.tasks.book_tasks.ImageConfig",
                 side_effect=capture_image_config,
             ),
             patch(
-                "src.core.image_generator.OpenRouterImageGenerator",
+                "src.tasks.book_tasks.OpenRouterImageGenerator",
                 return_value=mock_generator,
             ),
         ):
@@ -158,3 +164,172 @@ class TestRegenerationUsesPerImageModel:
         from src.core.config import DEFAULT_IMAGE_MODEL
         assert len(captured_models) >= 1
         assert captured_models[0] == DEFAULT_IMAGE_MODEL
+
+
+class TestRegenerationReusesBookContent:
+    @pytest.mark.asyncio
+    async def test_stored_book_content_skips_text_processing(self):
+        """Jobs with book_content_json rebuild pages from it instead of re-processing the story."""
+        from src.core.text_processor import BookContent, BookPage, PageType
+
+        factory, session = _mock_session_factory()
+        storage = AsyncMock()
+        stored = BookContent(
+            title="Stored Title",
+            pages=[BookPage(page_type=PageType.COVER, content="Stored Title", page_number=1)],
+        )
+        mock_job = MagicMock()
+        mock_job.request_params = {"story": "A bunny hops.", "title": "Test"}
+        mock_job.book_content_json = stored.to_dict()
+
+        with (
+            patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks.repo.get_book_job", new_callable=AsyncMock, return_value=mock_job) as mock_get_job,
+            patch("src.tasks.book_tasks.repo.get_completed_image_keys", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.delete_pdfs_for_book", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None) as mock_render,
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
+            patch("src.tasks.book_tasks._build_book_content") as mock_build,
+        ):
+            await _regenerate_book_inner(
+                _TEST_JOB_ID, [], _TEST_USER_ID,
+                session, factory, storage,
+            )
+
+        mock_build.assert_not_called()
+        assert mock_get_job.call_args.kwargs == {"with_content": True}
+        assert mock_render.call_args.kwargs["content"] == stored
+
+    @pytest.mark.asyncio
+    async def test_stored_book_content_skips_request_revalidation(self):
+        """Persisted request_params are trusted when the stored content is reused."""
+        from src.core.text_processor import BookContent, BookPage, PageType
+
+        factory, session = _mock_session_factory()
+        storage = AsyncMock()
+        stored = BookContent(
+            title="Stored Title",
+            pages=[BookPage(page_type=PageType.COVER, content="Stored Title", page_number=1)],
+        )
+        mock_job = MagicMock()
+        # age_min > age_max would fail BookGenerateRequest validation
+        mock_job.request_params = {"story": "A bunny hops.", "title": "Test", "age_min": 5, "age_max": 3}
+        mock_job.book_content_json = stored.to_dict()
+
+        with (
+            patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks.repo.get_book_job", new_callable=AsyncMock, return_value=mock_job),
+            patch("src.tasks.book_tasks.repo.get_completed_image_keys", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.delete_pdfs_for_book", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None) as mock_render,
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
+        ):
+            await _regenerate_book_inner(
+                _TEST_JOB_ID, [], _TEST_USER_ID,
+                session, factory, storage,
+            )
+
+        config = mock_render.call_args.kwargs["config"]
+        assert config.title == "Test"
+        assert config.font_size == 24
+
+
+class TestRegenerationRetryWrites:
+    @pytest.mark.asyncio
+    async def test_retry_writes_use_task_session(self):
+        """Per-image reset/update writes go through the shared task session."""
+        failed_imgs = [_make_failed_image(n) for n in (1, 2, 3)]
+        factory, session = _mock_session_factory()
+        storage = AsyncMock()
+        storage.download_to_file = AsyncMock(return_value=0)
+
+        mock_job = MagicMock()
+        mock_job.request_params = {"story": "A bunny hops.", "title": "Test"}
+        mock_job.book_content_json = None
+
+        gen_result = MagicMock()
+        gen_result.success = True
+        gen_result.image_data = b"fake-image-data"
+        gen_result.error = None
+
+        mock_generator = AsyncMock()
+        mock_generator.generate = AsyncMock(return_value=gen_result)
+
+        with (
+            patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks.repo.reset_image_for_retry", new_callable=AsyncMock) as mock_reset,
+            patch("src.tasks.book_tasks.repo.update_generated_image", new_callable=AsyncMock) as mock_update,
+            patch("src.tasks.book_tasks.repo.get_book_job", new_callable=AsyncMock, return_value=mock_job),
+            patch("src.tasks.book_tasks.repo.get_completed_image_keys", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.delete_pdfs_for_book", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
+            patch("src.tasks.book_tasks.OpenRouterImageGenerator", return_value=mock_generator),
+        ):
+            await _regenerate_book_inner(
+                _TEST_JOB_ID, failed_imgs, _TEST_USER_ID,
+                session, factory, storage,
+            )
+
+        # Same model for every page: one generator, closed once
+        mock_generator.close.assert_awaited_once()
+        assert mock_reset.await_count == 3
+        assert mock_update.await_count == 3
+        for c in mock_reset.await_args_list + mock_update.await_args_list:
+            assert c.args[0] is session
+
+    @pytest.mark.asyncio
+    async def test_failed_write_rolls_back_and_others_continue(self):
+        """A DB error on one page's write rolls back the shared session and is recorded on that page."""
+        failed_imgs = [_make_failed_image(n) for n in (1, 2, 3)]
+        factory, session = _mock_session_factory()
+        storage = AsyncMock()
+        storage.download_to_file = AsyncMock(return_value=0)
+
+        mock_job = MagicMock()
+        mock_job.request_params = {"story": "A bunny hops.", "title": "Test"}
+        mock_job.book_content_json = None
+
+        gen_result = MagicMock()
+        gen_result.success = True
+        gen_result.image_data = b"fake-image-data"
+        gen_result.error = None
+
+        mock_generator = AsyncMock()
+        mock_generator.generate = AsyncMock(return_value=gen_result)
+
+        async def _update(s, image_id, **fields):
+            if image_id == failed_imgs[0].id and fields["status"] == "completed":
+                raise RuntimeError("flush failed")
+
+        with (
+            patch("src.tasks.book_tasks.repo.update_book_job", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks.repo.reset_image_for_retry", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks.repo.update_generated_image", side_effect=_update) as mock_update,
+            patch("src.tasks.book_tasks.repo.get_book_job", new_callable=AsyncMock, return_value=mock_job),
+            patch("src.tasks.book_tasks.repo.get_completed_image_keys", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.delete_pdfs_for_book", new_callable=AsyncMock, return_value=[]),
+            patch("src.tasks.book_tasks.repo.bulk_create_generated_pdfs", new_callable=AsyncMock),
+            patch("src.tasks.book_tasks._get_pdf_executor", return_value=None),
+            patch("src.tasks.book_tasks.render_booklet_pdf", return_value=None),
+            patch("src.tasks.book_tasks.render_review_pdf", return_value=None),
+            patch("src.tasks.book_tasks.OpenRouterImageGenerator", return_value=mock_generator),
+        ):
+            await _regenerate_book_inner(
+                _TEST_JOB_ID, failed_imgs, _TEST_USER_ID,
+                session, factory, storage,
+            )
+
+        session.rollback.assert_awaited_once()
+        statuses = {
+            (c.args[1], c.kwargs["status"]) for c in mock_update.await_args_list
+        }
+        assert (failed_imgs[0].id, "failed") in statuses
+        assert (failed_imgs[1].id, "completed") in statuses
+        assert (failed_imgs[2].id, "completed") in statuses
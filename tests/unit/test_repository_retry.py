@@ -25,6 +25,21 @@ class TestGetFailedImagesForBook:
         session.execute.assert_awaited_once()
 
 
+class TestGetCompletedImageKeys:
+    async def test_returns_page_and_key_tuples(self):
+        session = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.all.return_value = [
+            MagicMock(page_number=1, r2_key="images/job1/page_1.png"),
+            MagicMock(page_number=3, r2_key="images/job1/page_3.png"),
+        ]
+        session.execute = AsyncMock(return_value=mock_result)
+
+        keys = await repo.get_completed_image_keys(session, uuid.uuid4())
+        assert keys == [(1, "images/job1/page_1.png"), (3, "images/job1/page_3.png")]
+        session.execute.assert_awaited_once()
+
+
 class TestResetImageForRetry:
     async def test_updates_image_fields(self):
         session = AsyncMock()
@@ -92,3 +107,50 @@ class TestCreateGeneratedImageModel:
 
         added_obj = session.add.call_args[0][0]
         assert added_obj.image_model is None
+
+
+class TestBulkCreateGeneratedImages:
+    async def test_inserts_all_rows_in_one_execute(self):
+        session = AsyncMock()
+        rows = [
+            {
+                "book_job_id": uuid.uuid4(), "user_id": uuid.uuid4(), "page_number": n,
+                "prompt": f"page {n}", "prompt_hash": "abc123", "status": "completed",
+                "r2_key": None, "file_size_bytes": None, "error": None, "cached": False,
+                "image_model": None,
+            }
+            for n in range(1, 4)
+        ]
+
+        await repo.bulk_create_generated_images(session, rows)
+
+        session.execute.assert_awaited_once()
+        stmt, params = session.execute.call_args[0]
+        assert stmt.table.name == GeneratedImage.__tablename__
+        assert params == rows
+        session.commit.assert_awaited_once()
+
+    async def test_empty_rows_is_noop(self):
+        session = AsyncMock()
+        await repo.bulk_create_generated_images(session, [])
+        session.execute.assert_not_called()
+        session.commit.assert_not_called()
+
+
+class TestBulkCreateGeneratedPdfs:
+    async def test_inserts_both_pdfs_in_one_execute(self):
+        session = AsyncMock()
+        rows = [
+            {"book_job_id": uuid.uuid4(), "user_id": uuid.uuid4(), "pdf_type": pdf_type,
+             "filename": f"{pdf_type}.pdf", "file_path": f"pdfs/job1/{pdf_type}.pdf",
+             "page_count": 10, "file_size_bytes": 1024}
+            for pdf_type in ("booklet", "review")
+        ]
+
+        await repo.bulk_create_generated_pdfs(session, rows)
+
+        session.execute.assert_awaited_once()
+        stmt, params = session.execute.call_args[0]
+        assert stmt.table.name == GeneratedPdf.__tablename__
+        assert params == rows
+        session.commit.assert_awaited_once()
@@ -1,5 +1,6 @@
 """Unit tests for src/core/storage.py — R2Storage client."""
 
+import asyncio
 import uuid
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -73,6 +74,20 @@ class TestUploadBytes:
             call_kwargs = client.put_object.call_args.kwargs
             assert call_kwargs["ContentType"] == "application/octet-stream"
 
+    async def test_large_body_uses_multipart_upload(self):
+        s = _make_storage()
+        cm, client = _mock_client()
+        data = b"x" * (8 * 1024 * 1024)
+        with patch.object(s, "_client", return_value=cm):
+            await s.upload_bytes(data, "pdfs/big.pdf", "application/pdf")
+        client.put_object.assert_not_called()
+        client.upload_fileobj.assert_awaited_once()
+        args, kwargs = client.upload_fileobj.call_args
+        assert args[0].getvalue() == data
+        assert args[1:] == ("test-bucket", "pdfs/big.pdf")
+        assert kwargs["ExtraArgs"] == {"ContentType": "application/pdf"}
+        assert kwargs["Config"].multipart_chunksize == 8 * 1024 * 1024
+
 
 # ---------------------------------------------------------------------------
 # upload_file
@@ -102,6 +117,34 @@ class TestUploadFile:
             size = await s.upload_file(str(test_file), "key")
             assert size == 1024
 
+    async def test_large_file_streams_from_disk(self, tmp_path):
+        s = _make_storage()
+        test_file = tmp_path / "big.pdf"
+        test_file.write_bytes(b"x" * (8 * 1024 * 1024))
+        parts = []
+
+        async def _upload_fileobj(fileobj, *args, **kwargs):
+            # upload_fileobj awaits read() results that are awaitable
+            while chunk := await fileobj.read(4 * 1024 * 1024):
+                parts.append(chunk)
+
+        cm, client = _mock_client()
+        client.upload_fileobj = AsyncMock(side_effect=_upload_fileobj)
+        with (
+            patch.object(s, "_client", return_value=cm),
+            patch("src.core.storage.asyncio.to_thread", wraps=asyncio.to_thread) as mock_to_thread,
+        ):
+            size = await s.upload_file(str(test_file), "pdfs/big.pdf", "application/pdf")
+
+        assert size == 8 * 1024 * 1024
+        assert b"".join(parts) == test_file.read_bytes()
+        # the stat, the open, and every read (including the final empty one) ran in threads
+        assert mock_to_thread.call_count == 2 + len(parts) + 1
+        client.put_object.assert_not_called()
+        args, kwargs = client.upload_fileobj.call_args
+        assert args[1:] == ("test-bucket", "pdfs/big.pdf")
+        assert kwargs["ExtraArgs"] == {"ContentType": "application/pdf"}
+
 
 # ---------------------------------------------------------------------------
 # download_bytes
@@ -161,6 +204,44 @@ class TestDownloadBytes:
                 await s.download_bytes("forbidden/key")
 
 
+# ---------------------------------------------------------------------------
+# download_to_file
+# ---------------------------------------------------------------------------
+
+
+class TestDownloadToFile:
+    async def test_streams_chunks_to_file(self, tmp_path):
+        s = _make_storage()
+        cm, client = _mock_client()
+
+        async def _chunks(chunk_size):
+            for chunk in (b"image-", b"data"):
+                yield chunk
+
+        body_mock = MagicMock()
+        body_mock.iter_chunks = _chunks
+        client.get_object = AsyncMock(return_value={"Body": body_mock})
+
+        target = tmp_path / "page_1.png"
+        with patch.object(s, "_client", return_value=cm):
+            size = await s.download_to_file("images/test.png", str(target))
+        assert size == len(b"image-data")
+        assert target.read_bytes() == b"image-data"
+
+    async def test_returns_none_on_nosuchkey(self, tmp_path):
+        s = _make_storage()
+        cm, client = _mock_client()
+
+        error_response = {"Error": {"Code": "NoSuchKey"}}
+        client.get_object = AsyncMock(
+            side_effect=ClientError(error_response, "GetObject")
+        )
+
+        with patch.object(s, "_client", return_value=cm):
+            size = await s.download_to_file("missing/key", str(tmp_path / "x.png"))
+            assert size is None
+
+
 # ---------------------------------------------------------------------------
 # delete
 # ---------------------------------------------------------------------------
@@ -178,6 +259,52 @@ class TestDelete:
             )
 
 
+# ---------------------------------------------------------------------------
+# delete_many
+# ---------------------------------------------------------------------------
+
+
+class TestDeleteMany:
+    async def test_batches_keys_into_delete_objects_calls(self):
+        s = _make_storage()
+        cm, client = _mock_client()
+        client.delete_objects.return_value = {}
+        keys = [f"pdfs/job1/{n}.pdf" for n in range(1500)]
+
+        with patch.object(s, "_client", return_value=cm):
+            count = await s.delete_many(keys)
+
+        assert count == 1500
+        assert client.delete_objects.await_count == 2
+        first, second = client.delete_objects.call_args_list
+        assert len(first.kwargs["Delete"]["Objects"]) == 1000
+        assert second.kwargs["Delete"]["Objects"][-1] == {"Key": "pdfs/job1/1499.pdf"}
+
+    async def test_reported_errors_raise_after_all_batches(self):
+        s = _make_storage()
+        cm, client = _mock_client()
+        client.delete_objects.side_effect = [
+            {"Errors": [{"Key": "pdfs/job1/3.pdf", "Code": "AccessDenied", "Message": "Access Denied"}]},
+            {},
+        ]
+        keys = [f"pdfs/job1/{n}.pdf" for n in range(1500)]
+
+        with patch.object(s, "_client", return_value=cm):
+            with pytest.raises(ClientError) as exc_info:
+                await s.delete_many(keys)
+
+        assert client.delete_objects.await_count == 2
+        assert exc_info.value.response["Error"]["Code"] == "AccessDenied"
+
+    async def test_empty_keys_is_noop(self):
+        s = _make_storage()
+        cm, client = _mock_client()
+
+        with patch.object(s, "_client", return_value=cm):
+            assert await s.delete_many([]) == 0
+        cm.__aenter__.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # delete_prefix
 # ---------------------------------------------------------------------------
@@ -1,5 +1,6 @@
 """Tests for credit confirm/release flows in create_story_task."""
 
+import asyncio
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -202,6 +203,68 @@ class TestStoryTaskCredits:
             mock_release.assert_called_once_with(_TEST_USAGE_LOG_ID, _TEST_USER_ID)
             mock_confirm.assert_not_called()
 
+    @pytest.mark.asyncio
+    async def test_exception_is_recorded_on_the_task_session(self):
+        """The failure path rolls back and reuses the task session instead of opening another."""
+        factory, session = _mock_session_factory()
+
+        mock_generator_instance = AsyncMock()
+        mock_generator_instance.generate_story = AsyncMock(
+            side_effect=RuntimeError("LLM service down")
+        )
+
+        mock_llm_config_instance = MagicMock()
+        mock_llm_config_instance.validate.return_value = True
+
+        with (
+            patch("src.tasks.story_tasks.get_session_factory", return_value=factory),
+            patch("src.tasks.story_tasks.repo.update_story_job", new_callable=AsyncMock) as mock_update,
+            patch("src.tasks.story_tasks.LLMConfig", return_value=mock_llm_config_instance),
+            patch("src.tasks.story_tasks.StoryGenerator", return_value=mock_generator_instance),
+            patch("src.tasks.story_tasks.CreditService.release", new_callable=AsyncMock),
+        ):
+            await create_story_task(
+                job_id=_TEST_JOB_ID,
+                request=_REQUEST,
+                user_id=_TEST_USER_ID,
+                usage_log_id=_TEST_USAGE_LOG_ID,
+            )
+
+        assert factory.call_count == 1
+        session.rollback.assert_awaited_once()
+        failed_call = mock_update.await_args_list[-1]
+        assert failed_call.args[0] is session
+        assert failed_call.kwargs["status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_cancellation_marks_failed_and_releases_credits(self):
+        """A cancelled task records the failure, releases credits, and re-raises."""
+        factory, _session = _mock_session_factory()
+
+        mock_generator_instance = AsyncMock()
+        mock_generator_instance.generate_story = AsyncMock(side_effect=asyncio.CancelledError())
+
+        mock_llm_config_instance = MagicMock()
+        mock_llm_config_instance.validate.return_value = True
+
+        with (
+            patch("src.tasks.story_tasks.get_session_factory", return_value=factory),
+            patch("src.tasks.story_tasks.repo.update_story_job", new_callable=AsyncMock) as mock_update,
+            patch("src.tasks.story_tasks.LLMConfig", return_value=mock_llm_config_instance),
+            patch("src.tasks.story_tasks.StoryGenerator", return_value=mock_generator_instance),
+            patch("src.tasks.story_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
+        ):
+            with pytest.raises(asyncio.CancelledError):
+                await create_story_task(
+                    job_id=_TEST_JOB_ID,
+                    request=_REQUEST,
+                    user_id=_TEST_USER_ID,
+                    usage_log_id=_TEST_USAGE_LOG_ID,
+                )
+
+        assert mock_update.await_args_list[-1].kwargs["status"] == "failed"
+        mock_release.assert_called_once_with(_TEST_USAGE_LOG_ID, _TEST_USER_ID)
+
     @pytest.mark.asyncio
     async def test_no_credit_ops_when_usage_log_none(self):
         """When usage_log_id is None, neither confirm nor release should be called."""
@@ -231,3 +294,101 @@ class TestStoryTaskCredits:
 
             mock_confirm.assert_not_called()
             mock_release.assert_not_called()
+
+
+class TestStoryTaskAdmission:
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped_and_backlog_counted(self):
+        """Only STORY_TASK_CONCURRENCY tasks run at once; admissions are returned when tasks finish."""
+        from src.tasks import story_tasks
+
+        running = 0
+        peak = 0
+        release = asyncio.Event()
+
+        async def _generate(**kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+            return _make_success_result()
+
+        factory, _session = _mock_session_factory()
+        mock_generator_instance = AsyncMock()
+        mock_generator_instance.generate_story = AsyncMock(side_effect=_generate)
+        mock_llm_config_instance = MagicMock()
+        mock_llm_config_instance.validate.return_value = True
+
+        with (
+            patch.object(story_tasks, "_story_slots", asyncio.Semaphore(2)),
+            patch.object(story_tasks, "STORY_BACKLOG_MAX", 3),
+            patch("src.tasks.story_tasks.get_session_factory", return_value=factory),
+            patch("src.tasks.story_tasks.repo.update_story_job", new_callable=AsyncMock),
+            patch("src.tasks.story_tasks.LLMConfig", return_value=mock_llm_config_instance),
+            patch("src.tasks.story_tasks.StoryGenerator", return_value=mock_generator_instance),
+        ):
+            admissions = [story_tasks.admit_story() for _ in range(3)]
+            assert None not in admissions
+            assert story_tasks.admit_story() is None
+
+            tasks = [
+                asyncio.create_task(
+                    create_story_task(_TEST_JOB_ID, _REQUEST, _TEST_USER_ID, admission=admission)
+                )
+                for admission in admissions
+            ]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(*tasks)
+
+            assert peak == 2
+            assert story_tasks._story_backlog == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_while_queued_fails_job_and_releases_credits(self):
+        """A task cancelled while waiting for a slot still fails its job and releases credits."""
+        from src.tasks import story_tasks
+
+        factory, _session = _mock_session_factory()
+
+        with (
+            patch.object(story_tasks, "_story_slots", asyncio.Semaphore(0)),
+            patch("src.tasks.story_tasks.get_session_factory", return_value=factory),
+            patch("src.tasks.story_tasks.repo.update_story_job", new_callable=AsyncMock) as mock_update,
+            patch("src.tasks.story_tasks.CreditService.release", new_callable=AsyncMock) as mock_release,
+        ):
+            admission = story_tasks.admit_story()
+            task = asyncio.create_task(
+                create_story_task(_TEST_JOB_ID, _REQUEST, _TEST_USER_ID, _TEST_USAGE_LOG_ID, admission)
+            )
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            assert mock_update.await_args.kwargs["status"] == "failed"
+            mock_release.assert_called_once_with(_TEST_USAGE_LOG_ID, _TEST_USER_ID)
+            assert story_tasks._story_backlog == 0
+
+    @pytest.mark.asyncio
+    async def test_task_without_admission_leaves_backlog_alone(self):
+        """Scheduling the task without an admission does not free a backlog place."""
+        from src.tasks import story_tasks
+
+        story_tasks.admit_story()
+        with patch("src.tasks.story_tasks.get_session_factory", return_value=None):
+            await create_story_task(_TEST_JOB_ID, _REQUEST, _TEST_USER_ID)
+
+        assert story_tasks._story_backlog == 1
+
+    def test_admission_released_once(self):
+        """Releasing an admission twice frees only one backlog place."""
+        from src.tasks import story_tasks
+
+        first = story_tasks.admit_story()
+        story_tasks.admit_story()
+        first.release()
+        first.release()
+
+        assert story_tasks._story_backlog == 1
@@ -50,6 +50,12 @@ class TestBookContent:
         ])
         assert content.is_valid_for_booklet() is False
 
+    def test_dict_round_trip(self, sample_book_content):
+        import json
+
+        data = json.loads(json.dumps(sample_book_content.to_dict()))
+        assert BookContent.from_dict(data) == sample_book_content
+
 
 # =============================================================================
 # TextProcessor._split_into_sentences